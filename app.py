@@ -6,10 +6,16 @@ import os
 # Load environment variables
 load_dotenv()
 
+from utils.image_io import UploadRequest
+
 app = Flask(__name__)
+# File upload dibatasi MAX_UPLOAD_BYTES per file saat form di-parse (di memori)
+app.request_class = UploadRequest
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 app.config['UPLOAD_FOLDER'] = "static/uploads"
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Batas total body request (upload batch / zip bisa berisi banyak gambar)
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', str(200 * 1024 * 1024)))
 
 app.config['MIDTRANS_SERVER_KEY'] = os.getenv('MIDTRANS_SERVER_KEY')
 app.config['MIDTRANS_CLIENT_KEY'] = os.getenv('MIDTRANS_CLIENT_KEY')
@@ -29,7 +35,11 @@ login_manager.login_message = 'Silakan login untuk mengakses halaman ini.'
 
 # Import models dan utils
 from models.user_model import User
-from utils.database import init_db
+from utils.migrate import check_schema
+from utils import db_session
+
+# Satu koneksi DB per request, dikembalikan ke pool di teardown
+db_session.init_app(app)
 
 # Import controllers
 from controllers.auth_controller import auth_controller
@@ -38,6 +48,7 @@ from controllers.eggmart_controller import eggmart_controller
 from controllers.eggmonitor_controller import eggmonitor_controller
 from controllers.eggmin_controller import eggmin_controller
 from controllers.chat_controller import chat_controller
+from controllers.health_controller import health_controller
 
 # Register blueprints
 app.register_blueprint(auth_controller)
@@ -46,15 +57,25 @@ app.register_blueprint(eggmart_controller, url_prefix='/eggmart')
 app.register_blueprint(eggmonitor_controller, url_prefix='/eggmonitor')
 app.register_blueprint(eggmin_controller, url_prefix='/eggmin')
 app.register_blueprint(chat_controller)
+app.register_blueprint(health_controller)
 
 # User loader untuk Flask-Login
 @login_manager.user_loader
 def load_user(user_id):
     return User.get_by_id(user_id)
 
-# Initialize database
+# Cek versi skema database (satu query); migrasi cuma jalan kalau tertinggal
+# dan MIGRATE_ON_BOOT=true. Manual: `python -m utils.migrate up`
 with app.app_context():
-    init_db()
+    check_schema()
+
+# Model ML di-load lazy saat scan pertama; MODEL_PRELOAD=true -> load + warm-up
+# di background supaya halaman lain tetap bisa dilayani selama model belum siap
+# (/readyz juga memicu warm-up ini)
+from config import MODEL_PRELOAD
+if MODEL_PRELOAD:
+    from utils.ml_utils import start_warm_up
+    start_warm_up()
 
 if __name__ == "__main__":
     app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
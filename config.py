@@ -13,10 +13,96 @@ DB_CONFIG = {
     'collation': 'utf8mb4_unicode_ci'
 }
 
+# Pool koneksi MySQL (utils/db_pool.py), per proses
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_POOL_TIMEOUT_S = float(os.getenv("DB_POOL_TIMEOUT_S", "5"))
+DB_POOL_PRE_PING_IDLE_S = float(os.getenv("DB_POOL_PRE_PING_IDLE_S", "10"))
+DB_POOL_MAX_LIFETIME_S = float(os.getenv("DB_POOL_MAX_LIFETIME_S", "3600"))
+# Jalankan migrasi yang tertinggal saat boot (utils/migrate.py); false -> cuma peringatan
+MIGRATE_ON_BOOT = os.getenv("MIGRATE_ON_BOOT", "true").lower() == "true"
+# Header X-DB-* (jumlah koneksi / query per request); selalu aktif kalau app.debug
+DB_DEBUG_HEADERS = os.getenv("DB_DEBUG_HEADERS", "false").lower() == "true"
+
 # ML Model configuration
 MODEL_PATH = "static/cangkang-cnn.keras"
+MODEL_COLOR_PATH = os.getenv("MODEL_COLOR_PATH", MODEL_PATH)
+MODEL_KEUTUHAN_PATH = os.getenv("MODEL_KEUTUHAN_PATH", "static/model_keutuhan.keras")
+# true -> model di-load di background thread saat app start (bukan saat scan pertama)
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "false").lower() == "true"
 CLASS_NAMES = ["Brown", "DarkBrown", "LightBrown"]
 UPLOAD_FOLDER = "static/uploads"
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(15 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", str(40_000_000)))
+# Decode gambar: "exact" (= keras load_img, sama dengan preprocessing training) /
+# "fast" (JPEG draft/DCT scaling + EXIF + 1x resize bicubic). Aktifkan "fast" hanya
+# setelah `python -m utils.decode_bench` menunjukkan label tidak bergeser.
+IMAGE_DECODE = os.getenv("IMAGE_DECODE", "exact").lower()
+# Simpan embedding (layer sebelum head) tiap scan -> utils/embedding_store.py.
+# Cuma backend keras; selama aktif prediksi tidak lewat prediction cache, micro-batching,
+# dan cascade HSV (embedding butuh forward pass penuh). Backend tflite: diabaikan.
+EMBEDDING_STORE = os.getenv("EMBEDDING_STORE", "false").lower() == "true"
+EMBEDDING_STORE_PATH = os.getenv("EMBEDDING_STORE_PATH", "data/scan_embeddings")
+# Pencarian "telur serupa": "auto" (IVF kalau file IVF berisi >= SIMILAR_IVF_MIN_SCANS scan,
+# selain itu exact), "exact", "ivf". IVF dilatih offline: python -m utils.similarity_index train
+SIMILAR_INDEX = os.getenv("SIMILAR_INDEX", "auto").lower()
+SIMILAR_IVF_MIN_SCANS = int(os.getenv("SIMILAR_IVF_MIN_SCANS", "200000"))
+SIMILAR_IVF_NPROBE = int(os.getenv("SIMILAR_IVF_NPROBE", "8"))
+# Maksimal telur yang diambil dari satu foto tray (/upload-tray)
+TRAY_MAX_EGGS = int(os.getenv("TRAY_MAX_EGGS", "60"))
+
+# Inference mode: "local" (model di proses web) / "service" (utils/inference_service.py)
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "local").lower()
+INFERENCE_SERVICE_HOST = os.getenv("INFERENCE_SERVICE_HOST", "127.0.0.1")
+INFERENCE_SERVICE_PORT = int(os.getenv("INFERENCE_SERVICE_PORT", "6001"))
+# Wajib di-set (rahasia acak, sama di service & web): pesan service = pickle, siapa pun
+# yang tahu key bisa menjalankan kode di proses service
+INFERENCE_SERVICE_AUTHKEY = os.getenv("INFERENCE_SERVICE_AUTHKEY", "")
+
+# Backend model: "keras" (.keras) / "tflite" (hasil python -m utils.model_export export)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "keras").lower()
+TFLITE_KEUTUHAN_PATH = os.getenv("TFLITE_KEUTUHAN_PATH", "static/model_keutuhan.tflite")
+TFLITE_COLOR_PATH = os.getenv("TFLITE_COLOR_PATH", "static/cangkang-cnn.tflite")
+
+# Model fused 1 backbone + 2 head (python -m utils.fused_model); "auto" = pakai kalau filenya ada
+FUSED_MODEL = os.getenv("FUSED_MODEL", "auto").lower()
+FUSED_MODEL_PATH = os.getenv("FUSED_MODEL_PATH", "static/eggvision-fused.keras")
+
+# true -> model Keras dipanggil lewat tf.function (utils/compiled_model.py), bukan model.predict
+INFERENCE_COMPILED = os.getenv("INFERENCE_COMPILED", "true").lower() == "true"
+
+# Model keutuhan & warna dijalankan bersamaan.
+# INFERENCE_*_OP_THREADS:
+# - keras : thread pool GLOBAL TensorFlow, berlaku untuk seluruh proses (dua model berbagi
+#           pool yang sama, bukan jatah per model); 0 = default TensorFlow (semua core)
+# - tflite: num_threads per interpreter (= jatah per model); 0 = otomatis, yaitu
+#           core / INFERENCE_PARALLEL_WORKERS kalau paralel, selain itu default TFLite
+INFERENCE_PARALLEL = os.getenv("INFERENCE_PARALLEL", "false").lower() == "true"
+INFERENCE_PARALLEL_WORKERS = int(os.getenv("INFERENCE_PARALLEL_WORKERS", "2"))
+INFERENCE_INTRA_OP_THREADS = int(os.getenv("INFERENCE_INTRA_OP_THREADS", "0"))
+INFERENCE_INTER_OP_THREADS = int(os.getenv("INFERENCE_INTER_OP_THREADS", "0"))
+
+# Micro-batching inference (utils/inference_scheduler.py)
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "true").lower() == "true"
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+INFERENCE_TIMEOUT_S = float(os.getenv("INFERENCE_TIMEOUT_S", "30"))
+
+# Scan async: upload langsung balik, prediksi + insert di background (utils/scan_jobs.py)
+SCAN_ASYNC = os.getenv("SCAN_ASYNC", "false").lower() == "true"
+SCAN_JOB_WORKERS = int(os.getenv("SCAN_JOB_WORKERS", "2"))
+SCAN_JOB_TTL_S = int(os.getenv("SCAN_JOB_TTL_S", "600"))
+
+# Streaming frame kamera (/eggmonitor/ws/frames)
+STREAM_MAX_CONCURRENT = int(os.getenv("STREAM_MAX_CONCURRENT", "2"))
+STREAM_MAX_FRAME_BYTES = int(os.getenv("STREAM_MAX_FRAME_BYTES", str(2 * 1024 * 1024)))
+
+# Cascade warna: aturan HSV (utils/color_rules.py) dulu, CNN warna cuma kalau margin < threshold
+COLOR_CASCADE = os.getenv("COLOR_CASCADE", "false").lower() == "true"
+COLOR_CASCADE_MARGIN = float(os.getenv("COLOR_CASCADE_MARGIN", "0.05"))
+
+# Cache hasil prediksi per hash isi gambar (utils/prediction_cache.py)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "1024"))
+PREDICTION_CACHE_PERSIST = os.getenv("PREDICTION_CACHE_PERSIST", "false").lower() == "true"
 
 # App configuration
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
@@ -7,6 +7,7 @@ import base64
 import requests
 
 from utils.db import get_db_connection  # sesuaikan
+from utils.scan_rollup import move_status
 import midtransclient   # <-- penting
 
 
@@ -143,7 +144,8 @@ def create_transaction():
                 VALUES (%s, %s, %s, 1)
             """, (order_db_id, egg_id, price))
 
-        # 6) Update egg_scans -> sold
+        # 6) Update egg_scans -> sold (rollup harian ikut dipindah status)
+        move_status(conn, egg_ids, 'sold')
         placeholders = ','.join(['%s'] * len(egg_ids))
         cur.execute(f"""
             UPDATE egg_scans
@@ -644,6 +646,7 @@ def save_listing():
         # ==========================
         # 2) Tandai telur-telur baru sebagai listed dengan harga baru
         # ==========================
+        move_status(conn, egg_ids, 'listed')
         placeholder = ','.join(['%s'] * len(egg_ids))
         params = [price] + egg_ids
         cur.execute(f"""
@@ -1,18 +1,58 @@
 # controllers/eggmonitor_controller.py
 import json
-from flask import Blueprint, render_template, request, url_for, redirect, flash, current_app, session, jsonify
+import threading
+import time
+from flask import (
+    Blueprint, render_template, request, url_for, redirect, flash, current_app, session, jsonify,
+    Response, stream_with_context,
+)
 from flask_login import login_required, current_user
 from utils.dashboard_data import build_dashboard_data
 from utils.report_data import build_report_data
 from utils.user_data import build_user_data
-from utils.ml_utils import predict_image
+from utils.ml_utils import (
+    predict_image_bytes, predict_images, predict_crops, predict_views, predict_frame,
+    get_inference_stats,
+)
 from utils.database import get_db_connection
+from utils.db_session import release_request_connection
+from utils.scan_store import scan_row, insert_scans, insert_scan_with_views
+from utils.scan_jobs import submit_scan, get_job
+from utils.similarity_index import get_index as get_similarity_index
+from utils.image_io import UploadRejected, read_upload, check_image, save_bytes_async, open_rgb
+from utils.tray_segmentation import find_eggs, crop_eggs
+from config import SCAN_ASYNC, STREAM_MAX_CONCURRENT, STREAM_MAX_FRAME_BYTES, TRAY_MAX_EGGS
+import io
 import os
+import uuid
+import zipfile
 import mysql.connector
 import paho.mqtt.client as mqtt
+from flask_sock import Sock
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 
 eggmonitor_controller = Blueprint('eggmonitor_controller', __name__)
+sock = Sock()
+
+# Maksimal gambar per request /upload-batch (1 tray = 30 butir)
+MAX_BATCH_FILES = 60
+MAX_ZIP_ENTRY_BYTES = 20 * 1024 * 1024
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+# Kamera vision per konveyor (lihat status_items di dashboard_data); field
+# form /upload-views = view_<nama>, view tengah jadi image_path utama egg_scans
+CAMERA_VIEWS = ("kanan", "tengah", "kiri")
+PRIMARY_VIEW = "tengah"
+
+
+@eggmonitor_controller.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    """File upload ditolak UploadRequest saat parsing (lewat MAX_UPLOAD_BYTES / MAX_CONTENT_LENGTH)"""
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify({"ok": False, "error": e.description}), 413
+    flash(e.description, 'error')
+    return redirect(url_for("eggmonitor_controller.eggmonitor"))
 
 
 @eggmonitor_controller.route('/')
@@ -26,8 +66,26 @@ def eggmonitor():
 
     data = build_dashboard_data(current_user.id)
 
+    # Scan async: ambil hasil dari job, kalau belum selesai tampilkan status "diproses"
+    last_scan = None
+    job_id = session.get('last_scan_job')
+    if job_id:
+        job = get_job(job_id, current_user.id)
+        if job is None:
+            # kedaluwarsa (SCAN_JOB_TTL_S) / DB tidak bisa dibaca: jangan diam-diam
+            session.pop('last_scan_job', None)
+            flash("Hasil scan terakhir tidak bisa ditampilkan, cek riwayat scan.", "info")
+        elif job["status"] == "error":
+            session.pop('last_scan_job', None)
+            flash("Scan telur gagal diproses.", "error")
+        elif job["status"] == "done":
+            session.pop('last_scan_job', None)
+            last_scan = job["result"]
+        else:
+            data.update(pending_scan_job=job_id)
+
     # Ambil hasil scan terakhir dari session (sekali pakai, kayak with() Laravel)
-    last_scan = session.pop('last_scan', None)
+    last_scan = session.pop('last_scan', None) or last_scan
     if last_scan:
         data.update(
             uploaded_image = url_for('static', filename=last_scan["image_path"]),
@@ -58,61 +116,45 @@ def upload():
 
     filename = secure_filename(file.filename)
     file_path = os.path.join(current_app.config["UPLOAD_FOLDER"], filename)
-    file.save(file_path)
+
+    # Baca ke memori (dengan batas ukuran) + cek header sebelum decode,
+    # file asli ditulis ke disk di background, bukan di jalur prediksi
+    try:
+        image_bytes = read_upload(file)
+        check_image(image_bytes)
+    except UploadRejected as e:
+        flash(str(e), 'error')
+        return redirect(url_for("eggmonitor_controller.eggmonitor"))
+    save_bytes_async(file_path, image_bytes)
+
+    # ====== Mode async: prediksi + insert jalan di background ======
+    # (job gagal dicatat di DB -> lanjut prediksi langsung di bawah)
+    job_id = None
+    if SCAN_ASYNC or request.values.get("async") == "1":
+        job_id = submit_scan(current_user.id, image_bytes, f"uploads/{filename}")
+    if job_id is not None:
+        if request.accept_mimetypes.best == "application/json":
+            return jsonify({
+                "ok": True,
+                "job_id": job_id,
+                "status_url": url_for("eggmonitor_controller.scan_job_status", job_id=job_id),
+                "events_url": url_for("eggmonitor_controller.scan_job_events", job_id=job_id),
+            }), 202
+        session["last_scan_job"] = job_id
+        flash("Scan telur sedang diproses.", "success")
+        return redirect(url_for("eggmonitor_controller.eggmonitor"))
 
     # ====== Prediksi gabungan (keutuhan + warna) ======
-    grade, grade_conf, detail = predict_image(file_path)
+    grade, grade_conf, detail = predict_image_bytes(image_bytes)
 
     # detail: {"keutuhan": "...", "color": "...", ...}
     keutuhan_pred = detail.get("keutuhan")
     color_pred    = detail.get("color")
 
     # Simpan ke tabel egg_scans
-    conn = get_db_connection()
-    if conn:
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO egg_scans (
-                    user_id,
-                    numeric_id,
-                    scanned_at,
-                    ketebalan,
-                    kebersihan,
-                    keutuhan,
-                    kesegaran,
-                    berat_telur,
-                    grade,
-                    confidence,
-                    image_path,
-                    status,
-                    is_listed
-                ) VALUES (
-                    %s, %s, NOW(), %s, %s, %s, %s, %s, %s, %s, %s,
-                    'available', FALSE
-                )
-                """,
-                (
-                    current_user.id,
-                    None,             # numeric_id
-                    None,             # ketebalan
-                    color_pred,       # sementara taruh warna di "kebersihan"
-                    keutuhan_pred,    # keutuhan
-                    None,             # kesegaran
-                    None,             # berat_telur
-                    grade,
-                    grade_conf,
-                    f"uploads/{filename}",
-                )
-            )
-            conn.commit()
-            cur.close()
-        except mysql.connector.Error as e:
-            print(f"Insert egg_scans error: {e}")
-            flash("Terjadi kesalahan saat menyimpan data scan telur.", "error")
-        finally:
-            conn.close()
+    row = scan_row(current_user.id, grade, grade_conf, detail, f"uploads/{filename}")
+    if not insert_scans([row], [detail.get("embedding")]):
+        flash("Terjadi kesalahan saat menyimpan data scan telur.", "error")
 
     # ====== Simpan hasil ke session untuk 1x tampilan di dashboard ======
     prediction_display = f"Grade {grade} · {keutuhan_pred or '-'} · {color_pred or '-'}"
@@ -129,6 +171,281 @@ def upload():
     return redirect(url_for("eggmonitor_controller.eggmonitor"))
 
 
+def _unique_filename(filename):
+    """
+    Prefix unik supaya file bernama sama (dalam satu batch, atau nama file
+    kamera yang berulang) tidak menimpa gambar milik scan sebelumnya
+    """
+    return f"{uuid.uuid4().hex[:12]}_{filename}"
+
+
+def _save_batch_files(upload_folder):
+    """
+    Simpan semua gambar dari request /upload-batch.
+    Terima multipart `files` (bisa banyak) dan/atau satu `zip` berisi gambar.
+    Maksimal MAX_BATCH_FILES file yang ditulis ke disk, sisanya diabaikan.
+    Tiap gambar dicek dulu dengan check_image (format, guard decompression
+    bomb / jumlah pixel); yang ditolak dilewati.
+    Return list nama file yang tersimpan di upload_folder.
+    """
+    saved = []
+
+    def _save(filename, image_bytes):
+        try:
+            check_image(image_bytes)
+        except UploadRejected as e:
+            print(f"[upload-batch] {filename} dilewati: {e}")
+            return
+        filename = _unique_filename(filename)
+        with open(os.path.join(upload_folder, filename), "wb") as dst:
+            dst.write(image_bytes)
+        saved.append(filename)
+
+    for file in request.files.getlist("files"):
+        if len(saved) >= MAX_BATCH_FILES:
+            break
+        if not file or file.filename == "":
+            continue
+        filename = secure_filename(file.filename)
+        if os.path.splitext(filename)[1].lower() not in IMAGE_EXTENSIONS:
+            continue
+        try:
+            image_bytes = read_upload(file)
+        except UploadRejected as e:
+            print(f"[upload-batch] {filename} dilewati: {e}")
+            continue
+        _save(filename, image_bytes)
+
+    archive = request.files.get("zip")
+    if archive and archive.filename and len(saved) < MAX_BATCH_FILES:
+        try:
+            with zipfile.ZipFile(archive.stream) as zf:
+                for info in zf.infolist():
+                    if info.is_dir():
+                        continue
+                    filename = secure_filename(os.path.basename(info.filename))
+                    if not filename or os.path.splitext(filename)[1].lower() not in IMAGE_EXTENSIONS:
+                        continue
+                    if info.file_size > MAX_ZIP_ENTRY_BYTES:
+                        continue
+                    if len(saved) >= MAX_BATCH_FILES:
+                        break
+                    # file_size dari header zip bisa bohong: baca maksimal batas + 1
+                    with zf.open(info) as src:
+                        image_bytes = src.read(MAX_ZIP_ENTRY_BYTES + 1)
+                    if len(image_bytes) > MAX_ZIP_ENTRY_BYTES:
+                        continue
+                    _save(filename, image_bytes)
+        except zipfile.BadZipFile:
+            flash("File zip tidak valid.", "error")
+
+    return saved
+
+
+@eggmonitor_controller.route('/upload-batch', methods=['POST'])
+@login_required
+def upload_batch():
+    """Upload banyak gambar telur (1 tray) -> satu batch prediksi -> executemany ke egg_scans"""
+    if current_user.role != 'pengusaha':
+        flash('Hanya Pengusaha yang dapat mengakses EggMonitor.', 'error')
+        return redirect(url_for('comprof_controller.comprof_beranda'))
+
+    filenames = _save_batch_files(current_app.config["UPLOAD_FOLDER"])
+    if not filenames:
+        flash('Tidak ada gambar telur yang valid.', 'error')
+        return redirect(url_for("eggmonitor_controller.eggmonitor"))
+
+    # ====== Prediksi satu batch (tiap model 1x forward pass) ======
+    file_paths = [os.path.join(current_app.config["UPLOAD_FOLDER"], f) for f in filenames]
+    results = predict_images(file_paths)
+
+    rows = [
+        scan_row(current_user.id, grade, grade_conf, detail, f"uploads/{filename}")
+        for filename, (grade, grade_conf, detail) in zip(filenames, results)
+    ]
+    if not insert_scans(rows, [detail.get("embedding") for _, _, detail in results]):
+        flash("Terjadi kesalahan saat menyimpan data scan telur.", "error")
+
+    session["last_scan"] = _batch_summary(results, f"uploads/{filenames[0]}")
+
+    flash(f"{len(results)} scan telur berhasil disimpan.", "success")
+    return redirect(url_for("eggmonitor_controller.eggmonitor"))
+
+
+def _batch_summary(results, image_path):
+    """Ringkasan banyak hasil scan untuk session["last_scan"] (jumlah per grade + rata-rata akurasi)"""
+    grade_counts = {code: 0 for code in ("A", "B", "C")}
+    for grade, _, _ in results:
+        grade_counts[grade] = grade_counts.get(grade, 0) + 1
+    avg_conf = sum(conf for _, conf, _ in results) / len(results)
+
+    return {
+        "image_path": image_path,
+        "prediction": f"{len(results)} telur · "
+                      + " · ".join(f"{code}: {cnt}" for code, cnt in grade_counts.items()),
+        "confidence": f"{avg_conf:.2f}%",
+    }
+
+
+@eggmonitor_controller.route('/upload-tray', methods=['POST'])
+@login_required
+def upload_tray():
+    """Satu foto tray / conveyor -> segmentasi per butir -> satu batch prediksi -> 1 baris egg_scans per telur"""
+    if current_user.role != 'pengusaha':
+        flash('Hanya Pengusaha yang dapat mengakses EggMonitor.', 'error')
+        return redirect(url_for('comprof_controller.comprof_beranda'))
+
+    file = request.files.get("file")
+    if not file or file.filename == "":
+        flash('File gambar tidak ditemukan.', 'error')
+        return redirect(url_for("eggmonitor_controller.eggmonitor"))
+
+    filename = _unique_filename(secure_filename(file.filename))
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+
+    try:
+        image_bytes = read_upload(file)
+        check_image(image_bytes)
+        img = open_rgb(io.BytesIO(image_bytes))
+    except UploadRejected as e:
+        flash(str(e), 'error')
+        return redirect(url_for("eggmonitor_controller.eggmonitor"))
+    except OSError:
+        flash('Gambar tidak bisa dibaca.', 'error')
+        return redirect(url_for("eggmonitor_controller.eggmonitor"))
+    save_bytes_async(os.path.join(upload_folder, filename), image_bytes)
+
+    boxes = find_eggs(img, TRAY_MAX_EGGS)
+    if not boxes:
+        flash('Tidak ada telur yang terdeteksi di foto.', 'error')
+        return redirect(url_for("eggmonitor_controller.eggmonitor"))
+
+    crops = crop_eggs(img, boxes)
+    results = predict_crops(crops)
+
+    # Crop disimpan di background, path-nya yang dicatat per telur; nama crop
+    # ikut stem unik foto tray supaya tray berikutnya tidak menimpanya
+    stem = os.path.splitext(filename)[0]
+    rows = []
+    for i, (crop, (grade, grade_conf, detail)) in enumerate(zip(crops, results)):
+        crop_name = f"{stem}_egg{i + 1:02d}.jpg"
+        buf = io.BytesIO()
+        crop.save(buf, format="JPEG", quality=90)
+        save_bytes_async(os.path.join(upload_folder, crop_name), buf.getvalue())
+        rows.append(scan_row(current_user.id, grade, grade_conf, detail, f"uploads/{crop_name}"))
+
+    if not insert_scans(rows, [detail.get("embedding") for _, _, detail in results]):
+        flash("Terjadi kesalahan saat menyimpan data scan telur.", "error")
+
+    session["last_scan"] = _batch_summary(results, f"uploads/{filename}")
+
+    flash(f"{len(results)} telur terdeteksi dan berhasil disimpan.", "success")
+    return redirect(url_for("eggmonitor_controller.eggmonitor"))
+
+
+@eggmonitor_controller.route('/upload-views', methods=['POST'])
+@login_required
+def upload_views():
+    """Satu telur dari beberapa kamera -> satu batch prediksi -> grade hasil fusi + simpan semua view"""
+    if current_user.role != 'pengusaha':
+        flash('Hanya Pengusaha yang dapat mengakses EggMonitor.', 'error')
+        return redirect(url_for('comprof_controller.comprof_beranda'))
+
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    views = []  # (camera, image_path relatif static, isi file)
+    try:
+        for camera in CAMERA_VIEWS:
+            file = request.files.get(f"view_{camera}")
+            if not file or file.filename == "":
+                continue
+            image_bytes = read_upload(file)
+            check_image(image_bytes)
+            # nama file per kamera biasanya sama tiap capture: prefix unik
+            # supaya scan berikutnya tidak menimpa gambar scan sebelumnya
+            filename = _unique_filename(f"{camera}_{secure_filename(file.filename)}")
+            save_bytes_async(os.path.join(upload_folder, filename), image_bytes)
+            views.append((camera, f"uploads/{filename}", image_bytes))
+    except UploadRejected as e:
+        flash(str(e), 'error')
+        return redirect(url_for("eggmonitor_controller.eggmonitor"))
+
+    if not views:
+        flash('Minimal satu gambar kamera dibutuhkan.', 'error')
+        return redirect(url_for("eggmonitor_controller.eggmonitor"))
+
+    grade, grade_conf, detail = predict_views([io.BytesIO(data) for _, _, data in views])
+
+    primary_path = next((path for camera, path, _ in views if camera == PRIMARY_VIEW), views[0][1])
+    view_rows = [
+        (camera, path, view_detail)
+        for (camera, path, _), view_detail in zip(views, detail["views"])
+    ]
+    if insert_scan_with_views(scan_row(current_user.id, grade, grade_conf, detail, primary_path), view_rows) is None:
+        flash("Terjadi kesalahan saat menyimpan data scan telur.", "error")
+
+    session["last_scan"] = {
+        "image_path": primary_path,
+        "prediction": f"Grade {grade} · {detail.get('keutuhan') or '-'} · {detail.get('color') or '-'}"
+                      f" · {len(views)} kamera",
+        "confidence": f"{grade_conf:.2f}%",
+    }
+
+    flash("Scan telur multi-kamera berhasil disimpan.", "success")
+    return redirect(url_for("eggmonitor_controller.eggmonitor"))
+
+
+def _job_payload(job):
+    return {
+        "ok": True,
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "result": job["result"],
+        "error": job["error"],
+    }
+
+
+@eggmonitor_controller.route('/scan-jobs/<job_id>')
+@login_required
+def scan_job_status(job_id):
+    """Polling status scan async"""
+    job = get_job(job_id, current_user.id)
+    if job is None:
+        return jsonify({"ok": False, "error": "job not found"}), 404
+    return jsonify(_job_payload(job))
+
+
+@eggmonitor_controller.route('/scan-jobs/<job_id>/events')
+@login_required
+def scan_job_events(job_id):
+    """Server-sent event: kirim status job sekali saat sudah selesai (done / error)"""
+    user_id = current_user.id
+    if get_job(job_id, user_id) is None:
+        return jsonify({"ok": False, "error": "job not found"}), 404
+
+    def stream():
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            job = get_job(job_id, user_id)
+            # status dibaca dari DB tiap putaran: jangan tahan koneksi di antaranya
+            release_request_connection()
+            if job is None:
+                break
+            if job["status"] != "pending":
+                yield f"event: {job['status']}\ndata: {json.dumps(_job_payload(job))}\n\n"
+                return
+            yield ": pending\n\n"  # keep-alive
+            time.sleep(0.25)
+        yield "event: timeout\ndata: {}\n\n"
+
+    # stream bisa terbuka sampai 60 detik: jangan tahan slot pool selama itu
+    release_request_connection()
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @eggmonitor_controller.route('/laporan')
 @login_required
 def eggmonitor_laporan():
@@ -216,6 +533,150 @@ def api_egg_color():
 
     return jsonify({"ok": True, "label": label})
 
+# =========================
+# WEBSOCKET: frame kamera -> klasifikasi CNN di server -> MQTT
+# =========================
+# Jumlah frame yang boleh diproses bersamaan di worker ini; frame yang datang
+# saat semua slot penuh langsung di-skip (bukan diantrikan) supaya tidak telat.
+_stream_slots = threading.BoundedSemaphore(STREAM_MAX_CONCURRENT)
+STREAM_PUBLISH_INTERVAL_S = 0.8
+
+
+@sock.route("/ws/frames", bp=eggmonitor_controller)
+@login_required
+def ws_frames(ws):
+    """
+    Client kirim frame JPEG (binary message) satu per satu, tunggu balasan
+    sebelum kirim frame berikutnya. Balasan JSON:
+      {"ok": true, "label": "brown", "grade": "B", ...} atau {"skipped": true}
+    Label warna dikirim ke MQTT dari sini (kalau berubah & ada jeda),
+    menggantikan klasifikasi HSV di browser.
+    """
+    # koneksi terbuka selama client tersambung: kembalikan koneksi DB
+    # (dipinjam load_user) ke pool sebelum loop frame
+    release_request_connection()
+    last_label = None
+    last_sent_at = 0.0
+
+    while True:
+        frame = ws.receive()
+        if frame is None:
+            break
+        if isinstance(frame, str) or len(frame) > STREAM_MAX_FRAME_BYTES:
+            ws.send(json.dumps({"ok": False, "error": "invalid frame"}))
+            continue
+
+        # guard yang sama dengan upload biasa sebelum decode
+        try:
+            check_image(frame)
+        except UploadRejected as e:
+            ws.send(json.dumps({"ok": False, "error": str(e)}))
+            continue
+
+        if not _stream_slots.acquire(blocking=False):
+            ws.send(json.dumps({"ok": False, "skipped": True}))
+            continue
+        try:
+            grade, grade_conf, detail = predict_frame(frame)
+        finally:
+            _stream_slots.release()
+
+        label = (detail.get("color") or "").lower() or None
+        published = False
+        now = time.monotonic()
+        if label and label != last_label and (now - last_sent_at) > STREAM_PUBLISH_INTERVAL_S:
+            mqtt_client.publish(MQTT_TOPIC_EGG_COLOR, label, qos=0, retain=False)
+            print("[MQTT eggcolor/stream] ->", label)
+            last_label, last_sent_at, published = label, now, True
+
+        ws.send(json.dumps({
+            "ok": label is not None,
+            "label": label,
+            "grade": grade,
+            "confidence": round(grade_conf, 2),
+            "keutuhan": detail.get("keutuhan"),
+            "published": published,
+            "timings_ms": detail.get("timings_ms"),
+        }))
+
+# =========================
+# API: counter scheduler inference (monitoring)
+# =========================
+@eggmonitor_controller.route("/api/inference-stats", methods=["GET"])
+@login_required
+def api_inference_stats():
+    return jsonify(get_inference_stats())
+
+# =========================
+# API: telur serupa (nearest neighbour embedding scan)
+# =========================
+SIMILAR_MAX_K = 50
+
+
+@eggmonitor_controller.route("/api/scans/<int:scan_id>/similar", methods=["GET"])
+@login_required
+def api_similar_scans(scan_id):
+    """Top-k scan milik user ini yang embedding-nya paling mirip dengan scan_id"""
+    k = min(max(request.args.get("k", 10, type=int), 1), SIMILAR_MAX_K)
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"ok": False, "error": "database tidak tersedia"}), 503
+
+    try:
+        cur = conn.cursor(dictionary=True)
+        cur.execute("SELECT id FROM egg_scans WHERE id = %s AND user_id = %s", (scan_id, current_user.id))
+        if cur.fetchone() is None:
+            return jsonify({"ok": False, "error": "scan tidak ditemukan"}), 404
+
+        # Index berisi scan semua user: ambil lebih banyak lalu saring milik user ini
+        index = get_similarity_index()
+        rows, fetch = [], k * 4
+        for _ in range(4):
+            neighbours = index.search(scan_id, fetch)
+            if not neighbours:
+                break
+            similarity = dict(neighbours)
+            placeholders = ", ".join(["%s"] * len(similarity))
+            cur.execute(
+                f"""
+                SELECT id, numeric_id, scanned_at, grade, confidence,
+                       keutuhan, kebersihan, image_path
+                FROM egg_scans
+                WHERE user_id = %s AND id IN ({placeholders})
+                """,
+                (current_user.id, *similarity),
+            )
+            rows = sorted(cur.fetchall(), key=lambda r: -similarity[r["id"]])[:k]
+            if len(rows) >= k or len(neighbours) < fetch:
+                break
+            fetch *= 4
+        cur.close()
+    except mysql.connector.Error as e:
+        print(f"Similar scans error: {e}")
+        return jsonify({"ok": False, "error": "query gagal"}), 500
+    finally:
+        conn.close()
+
+    return jsonify({
+        "ok": True,
+        "scan_id": scan_id,
+        "results": [
+            {
+                "id": row["id"],
+                "idNumerik": row["numeric_id"] or f"EV-{row['id']}",
+                "scanned_at": row["scanned_at"].isoformat() if row["scanned_at"] else None,
+                "grade": row["grade"],
+                "confidence": float(row["confidence"]) if row["confidence"] is not None else None,
+                "keutuhan": row["keutuhan"],
+                "warna": row["kebersihan"],
+                "image_url": url_for("static", filename=row["image_path"]) if row["image_path"] else None,
+                "similarity": round(similarity[row["id"]], 4),
+            }
+            for row in rows
+        ],
+    })
+
 # =========================
 # API: tombol kontrol LED manual -> MQTT
 # =========================
@@ -0,0 +1,64 @@
+from flask import Blueprint, jsonify
+from flask_login import login_required
+from utils.database import get_db_connection
+from utils.db_pool import pool_stats
+from utils import ml_utils
+import mysql.connector
+
+health_controller = Blueprint('health_controller', __name__)
+
+
+@health_controller.route('/healthz')
+def healthz():
+    """Liveness: proses hidup & bisa jawab request (tanpa cek dependency)"""
+    return jsonify({"ok": True})
+
+
+def _check_db():
+    conn = get_db_connection()
+    if not conn:
+        return False
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.fetchone()
+        cur.close()
+        return True
+    except mysql.connector.Error as e:
+        print(f"[readyz] DB error: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def _check_mqtt():
+    from controllers.eggmonitor_controller import mqtt_client
+    return mqtt_client.is_connected()
+
+
+@health_controller.route('/readyz')
+def readyz():
+    """
+    Readiness untuk load balancer: 200 kalau model sudah warm, DB & MQTT
+    tersambung; selain itu 503. Request pertama memicu warm-up model
+    di background kalau belum jalan.
+    """
+    ml_utils.start_warm_up()
+
+    checks = {
+        "models": ml_utils.models_ready(),
+        "db": _check_db(),
+        "mqtt": _check_mqtt(),
+    }
+    ready = all(checks.values())
+    body = {"ok": ready, "checks": checks}
+    if not checks["models"] and ml_utils.warm_up_error:
+        body["models_error"] = ml_utils.warm_up_error
+    return jsonify(body), 200 if ready else 503
+
+
+@health_controller.route('/api/db-pool-stats')
+@login_required
+def api_db_pool_stats():
+    """Counter pool koneksi MySQL proses ini (monitoring)"""
+    return jsonify(pool_stats())
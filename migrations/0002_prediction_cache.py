@@ -0,0 +1,18 @@
+# migrations/0002_prediction_cache.py
+"""Cache hasil ML per hash gambar (utils/prediction_cache.py)"""
+
+
+def up(cur):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS prediction_cache (
+            image_hash CHAR(64) PRIMARY KEY,
+            grade ENUM('A','B','C') NOT NULL,
+            grade_conf DECIMAL(5,2),
+            detail TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def down(cur):
+    cur.execute("DROP TABLE IF EXISTS prediction_cache")
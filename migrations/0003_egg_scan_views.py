@@ -0,0 +1,24 @@
+# migrations/0003_egg_scan_views.py
+"""Gambar per kamera untuk scan multi-view (/eggmonitor/upload-views)"""
+
+
+def up(cur):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS egg_scan_views (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            egg_scan_id INT NOT NULL,
+            camera VARCHAR(20) NOT NULL,
+            image_path VARCHAR(500) NOT NULL,
+
+            keutuhan VARCHAR(50),
+            keutuhan_conf DECIMAL(5,2),
+            color VARCHAR(50),
+            color_conf DECIMAL(5,2),
+
+            FOREIGN KEY (egg_scan_id) REFERENCES egg_scans(id) ON DELETE CASCADE
+        )
+    ''')
+
+
+def down(cur):
+    cur.execute("DROP TABLE IF EXISTS egg_scan_views")
@@ -0,0 +1,43 @@
+# migrations/0004_egg_scans_indexes.py
+"""
+Index komposit untuk query panas egg_scans (dashboard, laporan, EggMart).
+
+Tanpa ini semua query per user cuma punya index FK user_id, jadi tiap
+ORDER BY scanned_at / GROUP BY grade / alokasi stok listed berakhir di
+filesort / temporary table atas seluruh scan milik user itu.
+
+Dicek dengan `python -m utils.explain_check`.
+"""
+
+INDEXES = [
+    # COUNT / riwayat terbaru: WHERE user_id ORDER BY scanned_at DESC LIMIT n
+    ("ix_scans_user_scanned", "user_id, scanned_at"),
+    # ringkasan per grade, telur ready per grade, ambil telur available
+    # terlama untuk di-list (ORDER BY scanned_at)
+    ("ix_scans_user_grade_status", "user_id, grade, status, scanned_at"),
+    # alokasi telur listed saat checkout: harga sama, ORDER BY listed_at
+    ("ix_scans_listed", "user_id, grade, status, listed_price, listed_at"),
+]
+
+
+def _has_index(cur, table, index):
+    cur.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """,
+        (table, index),
+    )
+    return cur.fetchone()[0] > 0
+
+
+def up(cur):
+    for name, columns in INDEXES:
+        if not _has_index(cur, "egg_scans", name):
+            cur.execute(f"CREATE INDEX {name} ON egg_scans ({columns})")
+
+
+def down(cur):
+    for name, _ in reversed(INDEXES):
+        if _has_index(cur, "egg_scans", name):
+            cur.execute(f"DROP INDEX {name} ON egg_scans")
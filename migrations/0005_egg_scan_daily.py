@@ -0,0 +1,41 @@
+# migrations/0005_egg_scan_daily.py
+"""
+Rollup harian egg_scans per farm: (user, hari, grade, status) -> jumlah
+scan + total berat. Dijaga inkremental oleh utils/scan_rollup.py di
+transaksi yang sama dengan insert scan / perubahan status, dan langsung
+diisi dari data lama di sini (bisa diulang: python -m utils.scan_rollup rebuild).
+"""
+
+
+def up(cur):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS egg_scan_daily (
+            user_id INT NOT NULL,
+            day DATE NOT NULL,
+            grade ENUM('A','B','C') NOT NULL,
+            status ENUM('available','listed','sold','discarded') NOT NULL,
+
+            scan_count INT NOT NULL DEFAULT 0,
+            weight_sum DECIMAL(14,2) NOT NULL DEFAULT 0,
+            weight_count INT NOT NULL DEFAULT 0,   -- scan yang berat_telur-nya terisi
+
+            PRIMARY KEY (user_id, day, grade, status),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # backfill dari riwayat yang sudah ada
+    cur.execute("DELETE FROM egg_scan_daily")
+    cur.execute('''
+        INSERT INTO egg_scan_daily
+            (user_id, day, grade, status, scan_count, weight_sum, weight_count)
+        SELECT user_id, DATE(scanned_at), grade, COALESCE(status, 'available'),
+               COUNT(*), COALESCE(SUM(berat_telur), 0), COUNT(berat_telur)
+        FROM egg_scans
+        WHERE scanned_at IS NOT NULL
+        GROUP BY user_id, DATE(scanned_at), grade, COALESCE(status, 'available')
+    ''')
+
+
+def down(cur):
+    cur.execute("DROP TABLE IF EXISTS egg_scan_daily")
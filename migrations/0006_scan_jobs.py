@@ -0,0 +1,26 @@
+# migrations/0006_scan_jobs.py
+"""
+Status scan async (utils/scan_jobs.py) di DB, bukan di memori satu worker:
+poll / SSE / dashboard yang jatuh ke worker lain tetap menemukan job-nya.
+"""
+
+
+def up(cur):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS scan_jobs (
+            job_id CHAR(32) PRIMARY KEY,
+            user_id INT NOT NULL,
+            status ENUM('pending','done','error') NOT NULL DEFAULT 'pending',
+            result TEXT NULL,          -- JSON hasil scan (status done)
+            error TEXT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP NULL,
+
+            INDEX ix_scan_jobs_created (created_at),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+
+def down(cur):
+    cur.execute("DROP TABLE IF EXISTS scan_jobs")
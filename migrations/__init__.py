@@ -0,0 +1,3 @@
+# migrations/__init__.py
+# File migrasi bernomor: NNNN_nama.py, masing-masing punya up(cur) & down(cur).
+# Dijalankan lewat `python -m utils.migrate` (lihat utils/migrate.py).
@@ -0,0 +1,94 @@
+# tests/test_db_session.py
+"""Koneksi request (utils/db_session.py): satu checkout per request, dilepas sebelum streaming"""
+import pytest
+
+flask = pytest.importorskip("flask")
+pytest.importorskip("dotenv")
+pytest.importorskip("mysql.connector")
+
+from utils import db_session  # noqa: E402
+
+
+class _FakeConn:
+    unread_result = False
+    in_transaction = False
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._closed = False
+
+    def cursor(self, *args, **kwargs):
+        return object()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._pool.in_use -= 1
+
+
+class _FakePool:
+    def __init__(self):
+        self.in_use = 0
+        self.checkouts = 0
+
+    def get(self):
+        self.in_use += 1
+        self.checkouts += 1
+        return _FakeConn(self)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    fake = _FakePool()
+    monkeypatch.setattr(db_session, "get_pool", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def app():
+    app = flask.Flask(__name__)
+    db_session.init_app(app)
+    return app
+
+
+def test_streaming_route_does_not_hold_pool_slot(app, pool):
+    @app.route("/stream")
+    def stream():
+        # seperti load_user di route @login_required: pinjam, query, close
+        db_session.get_request_connection().close()
+        db_session.release_request_connection()
+
+        def events():
+            for _ in range(3):
+                yield f"data: {pool.in_use}\n\n"
+
+        return flask.Response(events(), mimetype="text/event-stream")
+
+    body = app.test_client().get("/stream").get_data(as_text=True)
+
+    assert body.count("data: 0") == 3
+    assert pool.in_use == 0
+
+
+def test_nested_borrows_share_one_connection(app, pool):
+    with app.test_request_context():
+        outer = db_session.get_request_connection()
+        inner = db_session.get_request_connection()
+        assert pool.in_use == 1
+        inner.close()
+        assert pool.in_use == 1
+        outer.close()
+        assert pool.in_use == 1
+
+    assert pool.in_use == 0
+
+
+def test_sequential_borrows_use_one_checkout(app, pool):
+    with app.test_request_context():
+        # load_user, build_dashboard_data, build_user_data: pinjaman terluar terpisah
+        for _ in range(3):
+            db_session.get_request_connection().close()
+        assert pool.checkouts == 1
+        assert pool.in_use == 1
+
+    assert pool.in_use == 0
@@ -0,0 +1,140 @@
+# utils/color_rules.py
+"""
+Klasifikasi warna cangkang cepat (tanpa CNN), versi NumPy dari
+`classifyEggColor` di templates/eggmonitor/detail_alat.html.
+
+Dipakai sebagai tahap pertama cascade di ml_utils: kalau margin aturan
+HSV cukup jauh dari batas, CNN warna tidak perlu dijalankan.
+
+Laporan untuk tuning threshold:
+
+    python -m utils.color_rules --images static/uploads --thresholds 0.02,0.05,0.1
+"""
+import argparse
+import os
+
+import numpy as np
+
+# Sama dengan aturan di browser
+HUE_MIN, HUE_MAX = 10.0, 50.0
+SAT_MIN = 0.25
+VAL_LIGHT = 0.65   # v >= ini -> lightbrown
+VAL_DARK = 0.40    # v <= ini -> darkbrown
+ROI_FRACTION = 0.35
+
+# Index sesuai ml_utils.CLASS_NAMES_COLOR = ["Brown", "DarkBrown", "LightBrown"]
+BROWN, DARK_BROWN, LIGHT_BROWN, UNKNOWN = 0, 1, 2, -1
+
+
+def _center_mean_rgb(batch):
+    """Rata-rata RGB area tengah (35%) tiap gambar: (N, H, W, 3) -> (N, 3) skala 0..1"""
+    _, h, w, _ = batch.shape
+    roi_h, roi_w = int(h * ROI_FRACTION), int(w * ROI_FRACTION)
+    y0, x0 = (h - roi_h) // 2, (w - roi_w) // 2
+    return batch[:, y0:y0 + roi_h, x0:x0 + roi_w, :].mean(axis=(1, 2))
+
+
+def _rgb_to_hsv(rgb):
+    """(N, 3) RGB 0..1 -> h (derajat), s, v; vektor semua"""
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    mx, mn = rgb.max(axis=1), rgb.min(axis=1)
+    d = mx - mn
+    safe_d = np.where(d == 0, 1.0, d)
+
+    h = np.where(
+        mx == r, 60.0 * (((g - b) / safe_d) % 6),
+        np.where(mx == g, 60.0 * ((b - r) / safe_d + 2), 60.0 * ((r - g) / safe_d + 4)),
+    )
+    h = np.where(d == 0, 0.0, h)
+    h = np.where(h < 0, h + 360.0, h)
+    s = np.where(mx == 0, 0.0, d / np.where(mx == 0, 1.0, mx))
+    return h, s, mx
+
+
+def classify_color_hsv(batch):
+    """
+    Batch (N, 224, 224, 3) skala 0..1 -> (class_idx[N], margin[N])
+
+    class_idx: index CLASS_NAMES_COLOR, atau UNKNOWN (-1) kalau bukan coklat.
+    margin: jarak terdekat ke batas aturan (hue/saturasi dalam skala 0..1,
+            value apa adanya). Makin besar, makin yakin aturannya benar.
+    """
+    h, s, v = _rgb_to_hsv(_center_mean_rgb(np.asarray(batch, dtype=np.float32)))
+
+    is_brown = (h >= HUE_MIN) & (h <= HUE_MAX) & (s >= SAT_MIN)
+    class_idx = np.where(v >= VAL_LIGHT, LIGHT_BROWN, np.where(v <= VAL_DARK, DARK_BROWN, BROWN))
+    class_idx = np.where(is_brown, class_idx, UNKNOWN)
+
+    hue_margin = np.minimum(h - HUE_MIN, HUE_MAX - h) / (HUE_MAX - HUE_MIN)
+    sat_margin = s - SAT_MIN
+    val_margin = np.where(
+        class_idx == LIGHT_BROWN, v - VAL_LIGHT,
+        np.where(class_idx == DARK_BROWN, VAL_DARK - v, np.minimum(v - VAL_DARK, VAL_LIGHT - v)),
+    )
+    margin = np.minimum(np.minimum(hue_margin, sat_margin), val_margin)
+    margin = np.where(is_brown, margin, 0.0)
+    return class_idx, margin
+
+
+def hsv_confidence(margin):
+    """Margin -> confidence (%) supaya sejajar dengan output CNN"""
+    return np.clip(0.5 + np.asarray(margin, dtype=np.float64), 0.0, 1.0) * 100
+
+
+def cascade_report(batch, cnn_idx, thresholds):
+    """
+    Untuk tiap threshold: porsi gambar yang diputuskan aturan HSV dan
+    agreement label akhir cascade vs CNN saja.
+    """
+    hsv_idx, margin = classify_color_hsv(batch)
+    rows = []
+    for threshold in thresholds:
+        use_hsv = (hsv_idx != UNKNOWN) & (margin >= threshold)
+        final_idx = np.where(use_hsv, hsv_idx, cnn_idx)
+        rows.append({
+            "threshold": threshold,
+            "hsv_rate": float(np.mean(use_hsv)),
+            "agreement": float(np.mean(final_idx == cnn_idx)),
+            "hsv_agreement": float(np.mean(hsv_idx[use_hsv] == cnn_idx[use_hsv])) if use_hsv.any() else 1.0,
+        })
+    return rows
+
+
+def main():
+    os.environ["INFERENCE_MODE"] = "local"
+    os.environ["COLOR_CASCADE"] = "false"  # pembanding = CNN murni
+    os.environ["FUSED_MODEL"] = "off"
+
+    from utils import ml_utils
+    from utils.model_export import _list_images
+
+    parser = argparse.ArgumentParser(description="Laporan cascade HSV -> CNN warna")
+    parser.add_argument("--images", default="static/uploads")
+    parser.add_argument("--thresholds", default="0.0,0.02,0.05,0.1,0.15")
+    args = parser.parse_args()
+
+    tensors = []
+    for path in _list_images(args.images):
+        try:
+            tensors.append(ml_utils._preprocess_image(path)[0])
+        except Exception as e:
+            print(f"Skip {path}: {e}")
+    if not tensors:
+        raise SystemExit("Tidak ada gambar")
+
+    batch = np.stack(tensors, axis=0)
+    ml_utils.load_models()
+    cnn_idx, _ = ml_utils._predict_probs(ml_utils.model_color, batch)
+    thresholds = [float(t) for t in args.thresholds.split(",")]
+
+    print(f"Cascade HSV -> CNN ({len(tensors)} gambar)")
+    print(f"{'threshold':>10} {'HSV memutuskan':>15} {'agreement':>10} {'agreement HSV':>14}")
+    for row in cascade_report(batch, cnn_idx, thresholds):
+        print(
+            f"{row['threshold']:>10.3f} {row['hsv_rate']:>15.1%} "
+            f"{row['agreement']:>10.1%} {row['hsv_agreement']:>14.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
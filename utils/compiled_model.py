@@ -0,0 +1,37 @@
+# utils/compiled_model.py
+"""
+Jalur inference ringan untuk model Keras (INFERENCE_COMPILED = true).
+
+`model.predict()` membangun data adapter, callback & progress bar di tiap
+panggilan, padahal kita cuma kirim 1 gambar. Di sini model dibungkus
+tf.function dengan input signature tetap (batch dinamis, 224x224x3 float32),
+jadi cukup di-trace sekali lalu tiap panggilan langsung eksekusi graph.
+"""
+import numpy as np
+
+
+class CompiledKerasModel:
+    """Bungkus model Keras; antarmuka sama: `predict(batch) -> numpy`"""
+
+    def __init__(self, model, input_shape=(224, 224, 3)):
+        import tensorflow as tf
+
+        self.model = model
+        self._tf = tf
+
+        def call(x):
+            return model(x, training=False)
+
+        self._fn = tf.function(
+            call,
+            input_signature=[tf.TensorSpec(shape=(None, *input_shape), dtype=tf.float32)],
+        )
+
+    def predict(self, batch, verbose=0):
+        x = self._tf.convert_to_tensor(np.asarray(batch, dtype=np.float32))
+        out = self._fn(x)
+        if isinstance(out, dict):
+            return {k: v.numpy() for k, v in out.items()}
+        if isinstance(out, (list, tuple)):
+            return [v.numpy() for v in out]
+        return out.numpy()
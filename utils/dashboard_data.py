@@ -37,7 +37,8 @@ def _build_header(user_id, total_scans):
 
 def build_dashboard_data(user_id: int):
     """
-    Bangun semua data untuk eggmonitor/index.html dari tabel egg_scans.
+    Bangun semua data untuk eggmonitor/index.html dari tabel egg_scans
+    (angka agregat dari rollup egg_scan_daily).
     """
     conn = get_db_connection()
     if not conn:
@@ -58,25 +59,19 @@ def build_dashboard_data(user_id: int):
     try:
         cur = conn.cursor(dictionary=True)
 
-        # Total scans untuk user ini
-        cur.execute(
-            "SELECT COUNT(*) AS cnt FROM egg_scans WHERE user_id = %s",
-            (user_id,),
-        )
-        total_scans = cur.fetchone()["cnt"]
-
-        # Hitung jumlah tiap grade
+        # Jumlah tiap grade + total, dari rollup harian (utils/scan_rollup.py)
         cur.execute(
             """
-            SELECT grade, COUNT(*) AS cnt
-            FROM egg_scans
+            SELECT grade, SUM(scan_count) AS cnt
+            FROM egg_scan_daily
             WHERE user_id = %s
             GROUP BY grade
             """,
             (user_id,),
         )
         grade_rows = cur.fetchall()
-        grade_counts_raw = {row["grade"]: row["cnt"] for row in grade_rows}
+        grade_counts_raw = {row["grade"]: int(row["cnt"]) for row in grade_rows}
+        total_scans = sum(grade_counts_raw.values())
         total_for_pct = sum(grade_counts_raw.values()) or 1  # avoid /0
 
         grade_defs = [
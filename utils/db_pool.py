@@ -0,0 +1,213 @@
+# utils/db_pool.py
+"""
+Pool koneksi MySQL bersama untuk seluruh aplikasi.
+
+get_db_connection() (utils/database.py & utils/db.py) sekarang meminjam
+koneksi dari sini. Kode lama tetap memanggil conn.close(), tapi close()
+di PooledConnection cuma mengembalikan koneksi ke pool (transaksi yang
+belum di-commit di-rollback dulu), jadi handshake TCP + TLS + auth cukup
+sekali per koneksi, bukan sekali per query.
+
+- ukuran maksimal   : DB_POOL_SIZE (dibuat lazy, sesuai kebutuhan)
+- checkout timeout  : DB_POOL_TIMEOUT_S, lewat dari itu -> PoolTimeout
+- pre-ping          : koneksi yang idle > DB_POOL_PRE_PING_IDLE_S di-ping
+                      dulu; kalau putus dibuka ulang
+- recycle           : koneksi lebih tua dari DB_POOL_MAX_LIFETIME_S ditutup
+"""
+import os
+import queue
+import threading
+import time
+
+import mysql.connector
+
+from config import (
+    DB_CONFIG,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_S,
+    DB_POOL_PRE_PING_IDLE_S,
+    DB_POOL_MAX_LIFETIME_S,
+)
+
+
+class PoolTimeout(mysql.connector.Error):
+    """Semua koneksi sedang dipinjam lebih lama dari checkout timeout"""
+
+
+class PooledConnection:
+    """Proxy koneksi mysql.connector; close() = kembalikan ke pool"""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._pool._release(self._raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    def __init__(self, config, size, timeout_s, pre_ping_idle_s, max_lifetime_s):
+        self.config = config
+        self.size = max(1, int(size))
+        self.timeout_s = timeout_s
+        self.pre_ping_idle_s = pre_ping_idle_s
+        self.max_lifetime_s = max_lifetime_s
+
+        self._idle = queue.LifoQueue()  # (raw, created_at, returned_at); LIFO -> koneksi "hangat" dulu
+        self._lock = threading.Lock()
+        self._open = 0
+        self._stats = {
+            "checkouts": 0,
+            "created": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "pings": 0,
+            "ping_failures": 0,
+            "recycled": 0,
+            "discarded": 0,
+            "wait_ms_total": 0.0,
+        }
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _connect(self):
+        raw = mysql.connector.connect(**self.config)
+        self._count("created")
+        return raw, time.monotonic()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._open -= 1
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._open < self.size:
+                self._open += 1
+                return True
+        return False
+
+    def _validate(self, raw, created_at, returned_at):
+        """Recycle koneksi tua, ping koneksi yang lama idle -> (raw, created_at) atau None"""
+        now = time.monotonic()
+        if self.max_lifetime_s and now - created_at > self.max_lifetime_s:
+            self._count("recycled")
+            return None
+        if now - returned_at >= self.pre_ping_idle_s:
+            self._count("pings")
+            try:
+                raw.ping(reconnect=False)
+            except mysql.connector.Error:
+                self._count("ping_failures")
+                return None
+        return raw, created_at
+
+    def get(self):
+        """Pinjam satu koneksi (PooledConnection). Raise PoolTimeout / mysql.connector.Error."""
+        t0 = time.monotonic()
+        deadline = t0 + self.timeout_s
+        waited = False
+
+        while True:
+            try:
+                raw, created_at, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                if self._reserve_slot():
+                    try:
+                        raw, created_at = self._connect()
+                    except mysql.connector.Error:
+                        with self._lock:
+                            self._open -= 1
+                        raise
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._count("timeouts")
+                    raise PoolTimeout(msg=f"DB pool habis ({self.size} koneksi) setelah {self.timeout_s}s")
+                waited = True
+                try:
+                    raw, created_at, returned_at = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+
+            checked = self._validate(raw, created_at, returned_at)
+            if checked is not None:
+                raw, created_at = checked
+                break
+            # koneksi basi: tutup, slot-nya dipakai bikin yang baru di putaran berikut
+            self._discard(raw)
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+            self._stats["wait_ms_total"] += (time.monotonic() - t0) * 1000
+        return PooledConnection(self, raw, created_at)
+
+    def _release(self, raw, created_at):
+        try:
+            if raw.unread_result:
+                raw.consume_results()
+            # jangan sampai transaksi setengah jadi kebawa ke peminjam berikutnya
+            raw.rollback()
+        except Exception:
+            self._count("discarded")
+            self._discard(raw)
+            return
+        self._idle.put((raw, created_at, time.monotonic()))
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data["open"] = self._open
+        data["idle"] = self._idle.qsize()
+        data["in_use"] = data["open"] - data["idle"]
+        data["size"] = self.size
+        data["timeout_s"] = self.timeout_s
+        data["wait_ms_total"] = round(data["wait_ms_total"], 2)
+        return data
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Satu pool per proses (dibuat ulang setelah fork: koneksi tidak boleh dipakai bareng)"""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = ConnectionPool(
+                    DB_CONFIG,
+                    size=DB_POOL_SIZE,
+                    timeout_s=DB_POOL_TIMEOUT_S,
+                    pre_ping_idle_s=DB_POOL_PRE_PING_IDLE_S,
+                    max_lifetime_s=DB_POOL_MAX_LIFETIME_S,
+                )
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def pool_stats():
+    return get_pool().stats()
@@ -0,0 +1,152 @@
+# utils/db_session.py
+"""
+Satu koneksi DB per request (disimpan di flask.g).
+
+Di dalam request, get_db_connection() tidak lagi meminjam koneksi baru
+dari pool untuk tiap helper (load_user, build_dashboard_data,
+_build_header, ...), tapi meminjam koneksi milik request ini.
+
+- Pinjaman bersarang (helper memanggil helper) berbagi koneksi yang sama.
+- close() dari helper cuma menandai pinjaman selesai; koneksi baru kembali
+  ke pool di teardown. Transaksi yang masih terbuka di-rollback saat
+  pinjaman terluar selesai, sama seperti perilaku pool (jadi tiap helper
+  tetap harus commit sendiri).
+- Request panjang (SSE, WebSocket) panggil release_request_connection()
+  sebelum mulai streaming, supaya tidak menahan slot pool selama
+  koneksinya terbuka. Pinjaman setelahnya ambil lagi dari pool.
+- Kalau koneksi request masih punya hasil query yang belum dibaca, pinjaman
+  bersarang dapat koneksi terpisah dari pool (supaya tidak "Unread result").
+
+Debug header (app.debug / DB_DEBUG_HEADERS=true):
+  X-DB-Connections  koneksi pool yang dipakai request ini
+  X-DB-Borrows      berapa kali get_db_connection() dipanggil
+  X-DB-Queries      jumlah execute / executemany
+"""
+from flask import current_app, g
+
+from config import DB_DEBUG_HEADERS
+from utils.db_pool import get_pool
+
+
+class _CountingCursor:
+    """Proxy cursor yang menghitung query ke counter request"""
+
+    def __init__(self, cursor, session):
+        self._cursor = cursor
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def execute(self, *args, **kwargs):
+        self._session.counters["queries"] += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._session.counters["queries"] += 1
+        return self._cursor.executemany(*args, **kwargs)
+
+
+class RequestConnection:
+    """Pinjaman koneksi request; close() tidak mengembalikan koneksi ke pool"""
+
+    def __init__(self, session):
+        self._session = session
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._session.conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return _CountingCursor(self._session.conn.cursor(*args, **kwargs), self._session)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._session.release()
+
+
+class RequestSession:
+    def __init__(self):
+        self.conn = None
+        self.depth = 0
+        self.counters = {"connections": 0, "borrows": 0, "queries": 0}
+
+    def borrow(self):
+        self.counters["borrows"] += 1
+        if self.conn is not None and self.depth > 0 and self.conn.unread_result:
+            self.counters["connections"] += 1
+            return get_pool().get()
+        if self.conn is None:
+            self.conn = get_pool().get()
+            self.counters["connections"] += 1
+        self.depth += 1
+        return RequestConnection(self)
+
+    def release(self):
+        self.depth -= 1
+        if self.depth > 0 or self.conn is None:
+            return
+        try:
+            if self.conn.unread_result:
+                self.conn.consume_results()
+            if self.conn.in_transaction:
+                self.conn.rollback()
+        except Exception as e:
+            # koneksi bermasalah: kembalikan (pool yang memutuskan buang / tidak)
+            print(f"[DB] request session reset error: {e}")
+            self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def get_request_connection():
+    """Koneksi milik request aktif (dibuat saat pertama dipinjam)"""
+    session = g.get("_db_session")
+    if session is None:
+        session = g._db_session = RequestSession()
+    return session.borrow()
+
+
+def release_request_connection():
+    """
+    Kembalikan koneksi request ke pool sekarang, bukan di teardown. Untuk
+    handler yang lama terbuka (SSE, WebSocket); tidak berlaku kalau masih
+    ada pinjaman yang belum di-close.
+    """
+    session = g.get("_db_session")
+    if session is not None and session.depth == 0:
+        session.close()
+
+
+def init_app(app):
+    @app.teardown_appcontext
+    def _close_db_session(exc):
+        session = g.pop("_db_session", None)
+        if session is not None:
+            session.close()
+
+    @app.after_request
+    def _db_debug_headers(response):
+        # app.debug baru pasti terisi saat request (app.run(debug=True) set belakangan)
+        if not (current_app.debug or DB_DEBUG_HEADERS):
+            return response
+        session = g.get("_db_session")
+        counters = session.counters if session else {"connections": 0, "borrows": 0, "queries": 0}
+        response.headers["X-DB-Connections"] = str(counters["connections"])
+        response.headers["X-DB-Borrows"] = str(counters["borrows"])
+        response.headers["X-DB-Queries"] = str(counters["queries"])
+        return response
@@ -0,0 +1,100 @@
+# utils/decode_bench.py
+"""
+Benchmark decode gambar: "exact" (decode penuh + resize nearest, sama dengan
+keras load_img) vs "fast" (JPEG draft/DCT scaling + EXIF + 1x resize bicubic).
+
+    python -m utils.decode_bench --images static/uploads
+    # cuma waktu decode, tanpa load model
+    python -m utils.decode_bench --images static/uploads --no-predict
+
+Parity dicek per gambar: label keutuhan & warna harus sama di dua mode,
+selisih confidence dilaporkan dalam poin persen.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+MODES = ("exact", "fast")
+
+
+def _timed_decode(paths, mode, repeat):
+    """Decode semua gambar `repeat` kali -> (tensors, latency ms per gambar)"""
+    from utils.ml_utils import _preprocess_image
+
+    tensors, latencies = {}, []
+    for path in paths:
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            try:
+                tensor = _preprocess_image(path, mode)
+            except Exception as e:
+                print(f"Skip {path}: {e}")
+                break
+            elapsed = (time.perf_counter() - t0) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        if best is not None:
+            tensors[path] = tensor[0]
+            latencies.append(best)
+    return tensors, np.array(latencies)
+
+
+def main():
+    os.environ["INFERENCE_MODE"] = "local"
+    os.environ["COLOR_CASCADE"] = "false"  # parity = output CNN murni
+
+    from utils import ml_utils
+    from utils.model_export import _list_images
+
+    parser = argparse.ArgumentParser(description="Benchmark decode exact vs fast")
+    parser.add_argument("--images", default="static/uploads")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3, help="ambil waktu terbaik dari N decode")
+    parser.add_argument("--no-predict", action="store_true", help="lewati cek parity prediksi")
+    args = parser.parse_args()
+
+    paths = _list_images(args.images, args.limit)
+    if not paths:
+        raise SystemExit("Tidak ada gambar")
+
+    decoded = {}
+    print(f"Decode {len(paths)} gambar (terbaik dari {args.repeat}x)")
+    for mode in MODES:
+        tensors, lat = _timed_decode(paths, mode, args.repeat)
+        decoded[mode] = tensors
+        print(
+            f"  {mode:<5} p50={np.percentile(lat, 50):.2f}ms  "
+            f"p95={np.percentile(lat, 95):.2f}ms  total={lat.sum():.0f}ms"
+        )
+
+    common = [p for p in paths if all(p in decoded[m] for m in MODES)]
+    if args.no_predict or not common:
+        return
+
+    ml_utils.load_models()
+    results = {}
+    for mode in MODES:
+        batch = np.stack([decoded[mode][p] for p in common], axis=0)
+        keutuhan_idx, keutuhan_conf, color_idx, color_conf = ml_utils._infer_batch_local(batch)
+        results[mode] = {
+            "keutuhan": (np.asarray(keutuhan_idx), np.asarray(keutuhan_conf)),
+            "color": (np.asarray(color_idx), np.asarray(color_conf)),
+        }
+
+    print(f"Parity exact vs fast ({len(common)} gambar)")
+    for name in ("keutuhan", "color"):
+        exact_idx, exact_conf = results["exact"][name]
+        fast_idx, fast_conf = results["fast"][name]
+        conf_diff = np.abs(exact_conf - fast_conf)
+        print(
+            f"  {name:<9} agreement={np.mean(exact_idx == fast_idx):.2%}  "
+            f"Δconf mean={np.mean(conf_diff):.2f}  max={np.max(conf_diff):.2f}"
+        )
+        for path in np.array(common)[exact_idx != fast_idx][:10]:
+            print(f"    beda: {path}")
+
+
+if __name__ == "__main__":
+    main()
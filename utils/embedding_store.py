@@ -0,0 +1,371 @@
+# utils/embedding_store.py
+"""
+Penyimpanan embedding (output layer sebelum head klasifikasi) per scan.
+
+File di EMBEDDING_STORE_PATH:
+- <path>.f16  : array float16 (kapasitas, dim) lewat np.memmap, baris ke-i
+                = egg_scans.id i
+- <path>.mask : uint8 (kapasitas,) 1 kalau baris sudah terisi
+- <path>.json : {"dim": D, "fingerprint": F}  (F = ml_utils.embedding_fingerprint)
+
+Ganti model (fused <-> dua model, model hasil training ulang) = ruang
+embedding baru: tulis pertama dengan fingerprint lain memindahkan store lama
+(beserta file IVF-nya) ke <path>.<hash fingerprint lama>.* lalu mulai store
+baru, jadi vektor dari dua model tidak pernah tercampur di satu index.
+
+Isi vektor: model fused -> fitur backbone bersama; dua model terpisah ->
+[fitur keutuhan | fitur warna] disambung. Head baru cukup dijalankan
+dengan NumPy di atas seluruh riwayat:
+
+    # simpan bobot head yang sekarang (butuh TensorFlow)
+    python -m utils.embedding_store export-heads --out heads.npz
+    # terapkan head (file npz: keutuhan_W, keutuhan_b, color_W, color_b)
+    python -m utils.embedding_store regrade --heads heads.npz
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+_MIN_CAPACITY = 1024
+# file yang ikut dipindah saat rotasi; .json terakhir (tanda rotasi selesai).
+# .ivf.npz = centroid utils/similarity_index untuk vektor store ini
+_FILE_SUFFIXES = (".f16", ".mask", ".ivf.npz", ".json")
+
+
+class EmbeddingStore:
+    """Array float16 memory-mapped, di-index langsung dengan egg_scans.id"""
+
+    def __init__(self, path, fingerprint=None):
+        self.path = path
+        self.fingerprint = fingerprint      # model yang menulis dari proses ini
+        self.dim = None
+        self.stored_fingerprint = None      # model yang mengisi store di disk
+        self._meta_mtime = None
+        self._vectors = None
+        self._mask = None
+        self._lock = threading.Lock()
+        self._read_meta()
+
+    # ---------- file ----------
+
+    def _read_meta(self):
+        meta_path = f"{self.path}.json"
+        try:
+            mtime = os.path.getmtime(meta_path)
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            mtime, meta = None, None
+        self._meta_mtime = mtime
+        self.dim = int(meta["dim"]) if meta else None
+        self.stored_fingerprint = meta.get("fingerprint") if meta else None
+        if self.dim is None:
+            self._vectors = self._mask = None
+        else:
+            self._open()
+
+    def _capacity_on_disk(self):
+        try:
+            return os.path.getsize(f"{self.path}.mask")
+        except OSError:
+            return 0
+
+    def _open(self):
+        capacity = self._capacity_on_disk()
+        if capacity == 0:
+            self._vectors = self._mask = None
+            return
+        self._vectors = np.memmap(f"{self.path}.f16", dtype=np.float16, mode="r+",
+                                  shape=(capacity, self.dim))
+        self._mask = np.memmap(f"{self.path}.mask", dtype=np.uint8, mode="r+", shape=(capacity,))
+
+    def _init_meta(self, dim):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # tulis atomik: proses lain bisa membaca .json kapan saja (_refresh_locked)
+        tmp_path = f"{self.path}.json.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": int(dim), "fingerprint": self.fingerprint}, f)
+        os.replace(tmp_path, f"{self.path}.json")
+        self.dim = int(dim)
+        self.stored_fingerprint = self.fingerprint
+        self._meta_mtime = os.path.getmtime(f"{self.path}.json")
+
+    def _rotate(self):
+        """
+        Pindahkan store lama ke <path>.<hash fingerprint lama>.*. Nama tujuan
+        sama di semua proses, jadi worker yang merotasi bersamaan tidak saling
+        timpa (file yang sudah dipindah proses lain dilewati).
+        """
+        old = hashlib.sha256((self.stored_fingerprint or "").encode()).hexdigest()[:12]
+        archive = f"{self.path}.{old}"
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._mask.flush()
+        for suffix in _FILE_SUFFIXES:
+            try:
+                os.replace(f"{self.path}{suffix}", f"{archive}{suffix}")
+            except FileNotFoundError:
+                pass
+        print(f"[EmbeddingStore] model berubah, store lama dipindah ke {archive}.*")
+        self.dim = self.stored_fingerprint = self._meta_mtime = None
+        self._vectors = self._mask = None
+
+    def _grow(self, min_capacity):
+        """Perbesar file (kapasitas x2) -- cuma membesar, aman dipanggil beberapa proses"""
+        capacity = max(_MIN_CAPACITY, self._capacity_on_disk())
+        while capacity < min_capacity:
+            capacity *= 2
+
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._mask.flush()
+        for suffix, row_bytes in ((".f16", self.dim * 2), (".mask", 1)):
+            with open(f"{self.path}{suffix}", "ab") as f:
+                if f.tell() < capacity * row_bytes:
+                    f.truncate(capacity * row_bytes)
+        self._open()
+
+    @property
+    def capacity(self):
+        return 0 if self._mask is None else len(self._mask)
+
+    def _refresh_locked(self):
+        """Proses lain mungkin sudah merotasi / memperbesar file: baca ulang meta / memmap"""
+        try:
+            mtime = os.path.getmtime(f"{self.path}.json")
+        except OSError:
+            mtime = None
+        if mtime != self._meta_mtime:
+            self._read_meta()
+        elif self.dim is not None and (self._vectors is None or self.capacity < self._capacity_on_disk()):
+            self._open()
+
+    # ---------- API ----------
+
+    def put(self, scan_id, vector):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        with self._lock:
+            self._refresh_locked()
+            if self.dim is not None and self.fingerprint and self.stored_fingerprint != self.fingerprint:
+                self._rotate()
+            if self.dim is None:
+                self._init_meta(vector.size)
+            elif vector.size != self.dim:
+                raise ValueError(f"Dimensi embedding {vector.size} != {self.dim}")
+
+            if scan_id >= self.capacity:
+                # proses lain mungkin sudah memperbesar file
+                if scan_id < self._capacity_on_disk():
+                    self._open()
+                else:
+                    self._grow(scan_id + 1)
+            self._vectors[scan_id] = vector.astype(np.float16)
+            self._mask[scan_id] = 1
+
+    def put_many(self, scan_ids, vectors):
+        for scan_id, vector in zip(scan_ids, vectors):
+            if vector is not None:
+                self.put(scan_id, vector)
+        self.flush()
+
+    def get(self, scan_ids):
+        """Embedding untuk scan_ids -> (N, dim) float32 (baris kosong = nol)"""
+        scan_ids = np.asarray(scan_ids, dtype=np.int64)
+        with self._lock:
+            self._refresh_locked()
+            out = np.zeros((len(scan_ids), self.dim or 0), dtype=np.float32)
+            if self._vectors is not None:
+                ok = scan_ids < self.capacity
+                out[ok] = self._vectors[scan_ids[ok]]
+        return out
+
+    def all(self):
+        """Semua baris terisi -> (ids[N], embeddings float16 [N, dim])"""
+        with self._lock:
+            self._refresh_locked()
+            if self._mask is None:
+                return np.zeros(0, dtype=np.int64), np.zeros((0, self.dim or 0), dtype=np.float16)
+            ids = np.flatnonzero(self._mask)
+            return ids, np.array(self._vectors[ids])
+
+    def since(self, after_id):
+        """Baris terisi dengan id > after_id -> (ids, embeddings float16)"""
+        with self._lock:
+            self._refresh_locked()
+            if self._mask is None or after_id + 1 >= self.capacity:
+                return np.zeros(0, dtype=np.int64), np.zeros((0, self.dim or 0), dtype=np.float16)
+            ids = np.flatnonzero(self._mask[after_id + 1:]) + after_id + 1
+            return ids, np.array(self._vectors[ids])
+
+    def chunks(self, after_id=-1, size=65536):
+        """
+        Baris terisi dengan id > after_id, per potongan `size` baris ->
+        iterator (ids, embeddings float16). Dibaca langsung dari memmap:
+        yang disalin ke memori cuma satu potongan.
+        """
+        start = after_id + 1
+        while True:
+            with self._lock:
+                self._refresh_locked()
+                if self._mask is None or start >= self.capacity:
+                    return
+                stop = min(self.capacity, start + size)
+                ids = np.flatnonzero(self._mask[start:stop]) + start
+                vectors = np.array(self._vectors[ids])
+            if len(ids):
+                yield ids, vectors
+            start = stop
+
+    def count(self):
+        """Jumlah baris terisi"""
+        with self._lock:
+            self._refresh_locked()
+            return 0 if self._mask is None else int(np.count_nonzero(self._mask))
+
+    def flush(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._mask.flush()
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "dim": self.dim,
+            "fingerprint": self.stored_fingerprint,
+            # True: tulis berikutnya dari proses ini akan merotasi store
+            "stale": bool(self.dim is not None and self.fingerprint and self.stored_fingerprint != self.fingerprint),
+            "capacity": self.capacity,
+            "stored": self.count(),
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Satu EmbeddingStore per proses, fingerprint = model keras di config"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from config import EMBEDDING_STORE_PATH
+                from utils.ml_utils import embedding_fingerprint
+                _store = EmbeddingStore(EMBEDDING_STORE_PATH, embedding_fingerprint())
+    return _store
+
+
+# ---------- re-grading dengan NumPy ----------
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def apply_heads(embeddings, heads):
+    """
+    embeddings (N, D) + heads {keutuhan_W, keutuhan_b, color_W, color_b}
+    -> (prob_keutuhan[N, 2], prob_color[N, 3]).
+
+    Kalau dim W keutuhan + W warna == D, embedding dianggap [keutuhan | warna];
+    kalau sama-sama D, dua head pakai fitur backbone yang sama (model fused).
+    """
+    x = np.asarray(embeddings, dtype=np.float32)
+    wk, bk = heads["keutuhan_W"], heads["keutuhan_b"]
+    wc, bc = heads["color_W"], heads["color_b"]
+
+    if wk.shape[0] + wc.shape[0] == x.shape[1]:
+        xk, xc = x[:, :wk.shape[0]], x[:, wk.shape[0]:]
+    elif wk.shape[0] == wc.shape[0] == x.shape[1]:
+        xk = xc = x
+    else:
+        raise ValueError(f"Bentuk head {wk.shape}/{wc.shape} tidak cocok dengan embedding dim {x.shape[1]}")
+    return _softmax(xk @ wk + bk), _softmax(xc @ wc + bc)
+
+
+def _export_heads(out_path):
+    from utils import ml_utils
+    from utils.fused_model import KEUTUHAN_OUTPUT, COLOR_OUTPUT
+
+    ml_utils.load_models()
+    if ml_utils.model_fused is not None:
+        layers = {
+            "keutuhan": ml_utils.model_fused.get_layer(KEUTUHAN_OUTPUT),
+            "color": ml_utils.model_fused.get_layer(COLOR_OUTPUT),
+        }
+    else:
+        layers = {"keutuhan": ml_utils.model_keutuhan.layers[-1], "color": ml_utils.model_color.layers[-1]}
+
+    arrays = {}
+    for name, layer in layers.items():
+        w, b = layer.get_weights()
+        arrays[f"{name}_W"], arrays[f"{name}_b"] = w, b
+    np.savez(out_path, **arrays)
+    print(f"✅ Head disimpan ke {out_path}")
+
+
+def _regrade(heads_path, limit_changes=20):
+    from utils.database import get_db_connection
+    from utils.ml_utils import CLASS_NAMES_KEUTUHAN, CLASS_NAMES_COLOR, _map_grade_batch
+
+    store = get_store()
+    if store.stats()["stale"]:
+        print("⚠️ Embedding store diisi model lain (fingerprint beda): head model sekarang mungkin tidak cocok")
+    ids, embeddings = store.all()
+    if len(ids) == 0:
+        raise SystemExit("Embedding store kosong")
+
+    heads = dict(np.load(heads_path))
+    prob_keutuhan, prob_color = apply_heads(embeddings, heads)
+    grades = _map_grade_batch(np.argmax(prob_color, axis=1), np.argmax(prob_keutuhan, axis=1))
+
+    current = {}
+    conn = get_db_connection()
+    if conn:
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT id, grade FROM egg_scans")
+            current = dict(cur.fetchall())
+            cur.close()
+        finally:
+            conn.close()
+
+    counts = {code: int(np.sum(grades == code)) for code in ("A", "B", "C")}
+    print(f"Regrade {len(ids)} scan: " + " · ".join(f"{k}: {v}" for k, v in counts.items()))
+    changed = [(int(i), current[int(i)], str(g)) for i, g in zip(ids, grades)
+               if int(i) in current and current[int(i)] != g]
+    print(f"{len(changed)} scan berubah grade (dibanding egg_scans)")
+    for scan_id, old, new in changed[:limit_changes]:
+        print(f"  #{scan_id}: {old} -> {new}")
+    print(f"(kelas: keutuhan={CLASS_NAMES_KEUTUHAN}, color={CLASS_NAMES_COLOR})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding store scan EggVision")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="ringkasan isi store")
+    p_export = sub.add_parser("export-heads", help="bobot head model sekarang -> npz")
+    p_export.add_argument("--out", default="heads.npz")
+    p_regrade = sub.add_parser("regrade", help="terapkan head dari npz ke semua embedding")
+    p_regrade.add_argument("--heads", required=True)
+    args = parser.parse_args()
+
+    # head diambil dari model di proses ini, bukan dari inference service
+    os.environ["INFERENCE_MODE"] = "local"
+
+    if args.command == "stats":
+        print(get_store().stats())
+    elif args.command == "export-heads":
+        _export_heads(args.out)
+    else:
+        _regrade(args.heads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+# utils/explain_check.py
+"""
+Cek rencana query (EXPLAIN) untuk semua query egg_scans di dashboard,
+laporan, dan EggMart, di atas tabel egg_scans berisi ~1 juta baris.
+
+    python -m utils.explain_check                  # DB scratch eggvision_explain
+    python -m utils.explain_check --rows 200000
+    python -m utils.explain_check --schema 3       # bandingkan: sebelum index 0004
+    python -m utils.explain_check --reseed
+
+Query tidak disalin ke sini: diambil langsung dari source (cur.execute(...)
+yang menyebut egg_scans), %s diisi nilai contoh sesuai kolomnya. Jadi query
+baru / query yang diubah otomatis ikut dicek.
+
+Gagal (exit 1) kalau ada baris EXPLAIN untuk egg_scans dengan:
+- type ALL   (full table scan) atau index (full index scan)
+- Extra "Using filesort" / "Using temporary"
+Filesort / temporary di tabel lain (mis. GROUP BY penjualan yang digerakkan
+dari orders milik seller) tidak dihitung: yang dijaga tabel besarnya.
+
+Jangan arahkan --database ke DB produksi: tabelnya diisi data dummy.
+"""
+import argparse
+import ast
+import os
+import re
+import time
+
+SOURCES = (
+    "utils/dashboard_data.py",
+    "utils/report_data.py",
+    "controllers/eggmart_controller.py",
+)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SEED_USERS = 100
+_SEED_ORDERS = 500
+_BATCH = 100_000  # baris per INSERT ... SELECT (5 tabel digit di-cross join)
+
+# nilai contoh untuk placeholder %s, berdasarkan kolom di kiri operator
+_SAMPLE_VALUES = {
+    "user_id": "{user}",
+    "seller_id": "{user}",
+    "grade": "'A'",
+    "status": "'listed'",
+    "listed_price": "2000",
+    "created_at": "'{since}'",
+    "id": "1",
+}
+_LIMIT_VALUE = "20"
+_IN_LIST = "1, 2, 3"
+_BAD_TYPES = {"ALL": "full table scan", "index": "full index scan"}
+_BAD_EXTRA = ("Using filesort", "Using temporary")
+_SCAN_TABLES = {"egg_scans", "es"}
+
+
+# ---------- ambil query dari source ----------
+
+def _sql_text(node):
+    """Argumen pertama execute() -> teks SQL (f-string: {..} jadi daftar IN contoh)"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(value.value)
+            else:
+                parts.append(_IN_LIST)
+        return "".join(parts)
+    return None
+
+
+def collect_queries(sources=SOURCES):
+    """[(lokasi 'file:baris', sql)] untuk tiap execute() yang menyentuh egg_scans"""
+    queries = []
+    for rel in sources:
+        with open(os.path.join(ROOT, rel)) as f:
+            tree = ast.parse(f.read(), filename=rel)
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and node.func.attr == "execute" and node.args):
+                continue
+            sql = _sql_text(node.args[0])
+            if sql and re.search(r"\begg_scans\b", sql) and not re.match(r"\s*INSERT\b", sql, re.I):
+                queries.append((f"{rel}:{node.lineno}", sql))
+    queries.sort(key=lambda q: (q[0].split(":")[0], int(q[0].split(":")[1])))
+    return queries
+
+
+def fill_params(sql, user_id, since):
+    """Ganti tiap %s dengan nilai contoh berdasarkan kolom / klausa sebelumnya"""
+    out, pos = [], 0
+    for match in re.finditer(r"%s", sql):
+        before = sql[:match.start()]
+        column = re.search(r"([\w.]+)\s*(?:=|>=|<=|<|>)\s*$", before)
+        if re.search(r"\bLIMIT\s*$", before, re.I):
+            value = _LIMIT_VALUE
+        elif column and column.group(1).split(".")[-1] in _SAMPLE_VALUES:
+            value = _SAMPLE_VALUES[column.group(1).split(".")[-1]]
+        else:
+            context = " ".join(before.split()[-4:])
+            raise ValueError(f"Tidak tahu nilai contoh untuk %s setelah '{context}' (tambah ke _SAMPLE_VALUES)")
+        out.append(sql[pos:match.start()])
+        out.append(value.format(user=user_id, since=since))
+        pos = match.end()
+    out.append(sql[pos:])
+    return "".join(out)
+
+
+# ---------- data dummy ----------
+
+def _digits(n):
+    """n tabel turunan 0..9 (alias t0..t{n-1}, kolom d) yang di-cross join"""
+    digits = " UNION ALL ".join(f"SELECT {i} AS d" for i in range(10))
+    return " CROSS JOIN ".join(f"({digits}) t{i}" for i in range(n))
+
+
+def _seed(conn, rows, force=False):
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM egg_scans")
+    existing = cur.fetchone()[0]
+    if existing >= rows and not force:
+        cur.execute("SELECT MIN(user_id) FROM egg_scans")
+        first_user = cur.fetchone()[0]
+        print(f"egg_scans sudah {existing} baris, seed dilewati")
+        cur.close()
+        return first_user
+
+    print(f"Seed {rows} baris egg_scans ...")
+    t0 = time.perf_counter()
+    cur.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in ("order_items", "orders", "egg_scans", "users"):
+        cur.execute(f"DELETE FROM {table}")
+    cur.executemany(
+        "INSERT INTO users (name, email, password, role) VALUES (%s, %s, %s, 'pengusaha')",
+        [(f"Explain {i}", f"explain{i}@example.invalid", "-") for i in range(_SEED_USERS)],
+    )
+    conn.commit()
+    cur.execute("SELECT MIN(id) FROM users")
+    first_user = cur.fetchone()[0]
+
+    n_expr = " + ".join(f"t{i}.d * {10 ** i}" for i in range(5))
+    for batch in range((rows + _BATCH - 1) // _BATCH):
+        n = f"({batch * _BATCH} + {n_expr})"
+        status = f"ELT(1 + ({n} DIV 7) % 5, 'available', 'available', 'available', 'listed', 'sold')"
+        cur.execute(f"""
+            INSERT INTO egg_scans (
+                user_id, numeric_id, scanned_at, keutuhan, berat_telur,
+                grade, confidence, kategori, status, is_listed, listed_price, listed_at
+            )
+            SELECT
+                {first_user} + {n} % {_SEED_USERS},
+                CONCAT('EV-', {n}),
+                NOW() - INTERVAL ({n} % 525600) MINUTE,
+                IF({n} % 10 = 0, 'Retak', 'Utuh'),
+                55 + ({n} % 150) / 10,
+                ELT(1 + {n} % 3, 'A', 'B', 'C'),
+                90,
+                ELT(1 + {n} % 3, 'A', 'B', 'C'),
+                {status},
+                {status} <> 'available',
+                IF({status} = 'available', NULL, ELT(1 + {n} % 2, 2000, 2500)),
+                IF({status} = 'available', NULL, NOW() - INTERVAL ({n} % 43200) MINUTE)
+            FROM {_digits(5)}
+            WHERE {n} < {rows}
+        """)
+        conn.commit()
+        print(f"  {min(rows, (batch + 1) * _BATCH)} baris")
+
+    # penjualan seller contoh, supaya query join orders punya rencana realistis
+    cur.executemany(
+        """
+        INSERT INTO orders (buyer_id, seller_id, total, midtrans_order_id, status, created_at)
+        VALUES (%s, %s, 0, %s, 'paid', NOW() - INTERVAL %s DAY)
+        """,
+        [(first_user + 1, first_user, f"EXPLAIN-{i}", i % 60) for i in range(_SEED_ORDERS)],
+    )
+    cur.execute("SELECT MIN(id) FROM orders")
+    first_order = cur.fetchone()[0]
+    cur.execute(f"""
+        INSERT INTO order_items (order_id, egg_scan_id, price, quantity)
+        SELECT {first_order} + id % {_SEED_ORDERS}, id, listed_price, 1
+        FROM egg_scans
+        WHERE user_id = {first_user} AND status = 'sold'
+    """)
+    cur.execute("SET FOREIGN_KEY_CHECKS = 1")
+    conn.commit()
+
+    for table in ("users", "egg_scans", "orders", "order_items"):
+        cur.execute(f"ANALYZE TABLE {table}")
+        cur.fetchall()
+    cur.close()
+    print(f"Seed selesai dalam {time.perf_counter() - t0:.0f}s")
+    return first_user
+
+
+# ---------- cek rencana ----------
+
+def check_plan(rows):
+    """Baris EXPLAIN (dict) -> list masalah"""
+    problems = []
+    for row in rows:
+        if row.get("table") not in _SCAN_TABLES:
+            continue
+        if row.get("type") in _BAD_TYPES:
+            problems.append(f"{_BAD_TYPES[row['type']]} (type={row['type']}, rows={row.get('rows')})")
+        extra = row.get("Extra") or ""
+        problems += [f"{flag.lower()} di {row['table']}" for flag in _BAD_EXTRA if flag in extra]
+    return problems
+
+
+def _plan_summary(rows):
+    return ", ".join(
+        f"{row['table']}:{row.get('type')}/{row.get('key') or '-'}"
+        for row in rows if row.get("table")
+    )
+
+
+def run_checks(conn, user_id):
+    since = time.strftime("%Y-%m-%d", time.localtime(time.time() - 30 * 86400))
+    queries = collect_queries()
+    if not queries:
+        raise SystemExit("Tidak ada query egg_scans yang ketemu di source")
+
+    failed = 0
+    cur = conn.cursor(dictionary=True)
+    for location, sql in queries:
+        first_line = " ".join(sql.split())[:70]
+        try:
+            cur.execute("EXPLAIN " + fill_params(sql, user_id, since))
+            rows = cur.fetchall()
+        except Exception as e:
+            conn.rollback()
+            failed += 1
+            print(f"❌ {location}  {first_line}\n     EXPLAIN gagal: {e}")
+            continue
+        problems = check_plan(rows)
+        if problems:
+            failed += 1
+            print(f"❌ {location}  {first_line}\n     {_plan_summary(rows)}")
+            for problem in problems:
+                print(f"     - {problem}")
+        else:
+            print(f"✅ {location}  {_plan_summary(rows)}")
+    # EXPLAIN UPDATE tidak mengubah data, tapi jaga-jaga
+    conn.rollback()
+    cur.close()
+    print(f"\n{len(queries) - failed}/{len(queries)} query lolos")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN query egg_scans di atas data dummy besar")
+    parser.add_argument("--database", default="eggvision_explain", help="DB scratch (dibuat kalau belum ada)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--schema", type=int, default=None, help="versi migrasi (default terbaru)")
+    parser.add_argument("--reseed", action="store_true", help="hapus & isi ulang data dummy")
+    args = parser.parse_args()
+
+    # config dibaca saat import: arahkan dulu ke DB scratch
+    os.environ["DB_NAME"] = args.database
+    import mysql.connector
+
+    from config import DB_CONFIG
+    from utils import migrate
+    from utils.database import get_db_connection
+
+    server = {k: v for k, v in DB_CONFIG.items() if k != "database"}
+    raw = mysql.connector.connect(**server)
+    raw.cursor().execute(f"CREATE DATABASE IF NOT EXISTS `{args.database}`")
+    raw.close()
+
+    target = migrate.latest_version() if args.schema is None else args.schema
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        version = migrate.current_version(cur)
+        cur.close()
+    finally:
+        conn.close()
+    if version > target:
+        migrate.downgrade(target)
+    else:
+        migrate.upgrade(target)
+
+    conn = get_db_connection()
+    try:
+        user_id = _seed(conn, args.rows, force=args.reseed)
+        failed = run_checks(conn, user_id)
+    finally:
+        conn.close()
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# utils/fused_model.py
+"""
+Model gabungan (fused): satu backbone, dua head klasifikasi.
+
+Format yang di-load ml_utils: file .keras dengan dua output bernama
+"keutuhan" (softmax 2 kelas, urutan CLASS_NAMES_KEUTUHAN) dan "color"
+(softmax 3 kelas, urutan CLASS_NAMES_COLOR). Kalau file di FUSED_MODEL_PATH
+ada, predict_image cukup SATU forward pass per telur.
+
+Bikin dari dua model lama lewat distilasi:
+
+    python -m utils.fused_model --images static/uploads --epochs 15
+
+- backbone + head "color" = salinan model warna (cangkang-cnn.keras)
+- head "keutuhan" baru, dilatih meniru output softmax model_keutuhan
+  (teacher) di atas fitur backbone yang sama
+- opsional --finetune: buka backbone, latih ulang kedua head bareng
+  dengan target soft-label dari kedua teacher
+"""
+import argparse
+import os
+
+import numpy as np
+
+KEUTUHAN_OUTPUT = "keutuhan"
+COLOR_OUTPUT = "color"
+
+
+def split_outputs(pred):
+    """Output model fused (dict / list) -> (prob_keutuhan, prob_color)"""
+    if isinstance(pred, dict):
+        return pred[KEUTUHAN_OUTPUT], pred[COLOR_OUTPUT]
+    return pred[0], pred[1]
+
+
+def build_fused_model(color_model, n_keutuhan):
+    """Backbone + head warna dari color_model, tambah head keutuhan baru"""
+    import keras
+
+    features = color_model.layers[-2].output
+    color_dense = color_model.layers[-1]
+
+    color_head = keras.layers.Dense(
+        color_dense.units, activation="softmax", name=COLOR_OUTPUT
+    )
+    keutuhan_head = keras.layers.Dense(n_keutuhan, activation="softmax", name=KEUTUHAN_OUTPUT)
+
+    fused = keras.Model(
+        inputs=color_model.inputs,
+        outputs={KEUTUHAN_OUTPUT: keutuhan_head(features), COLOR_OUTPUT: color_head(features)},
+        name="eggvision_fused",
+    )
+    color_head.set_weights(color_dense.get_weights())
+    return fused
+
+
+def distill(image_paths, output_path, epochs=15, finetune=False, batch_size=16):
+    import keras
+    from utils import ml_utils
+
+    ml_utils.load_models()
+
+    tensors = []
+    for path in image_paths:
+        try:
+            tensors.append(ml_utils._preprocess_image(path)[0])
+        except Exception as e:
+            print(f"Skip {path}: {e}")
+    if not tensors:
+        raise SystemExit("Tidak ada gambar untuk distilasi")
+
+    x = np.stack(tensors, axis=0)
+    # Augmentasi sederhana (flip) biar head baru tidak hafal sampel
+    x = np.concatenate([x, x[:, :, ::-1, :], x[:, ::-1, :, :]], axis=0)
+
+    y_keutuhan = ml_utils.model_keutuhan.predict(x, verbose=0)
+    y_color = ml_utils.model_color.predict(x, verbose=0)
+
+    fused = build_fused_model(ml_utils.model_color, len(ml_utils.CLASS_NAMES_KEUTUHAN))
+
+    # Tahap 1: backbone + head warna dibekukan, cuma head keutuhan yang belajar
+    for layer in fused.layers:
+        layer.trainable = layer.name == KEUTUHAN_OUTPUT
+    fused.compile(
+        optimizer=keras.optimizers.Adam(1e-3),
+        loss={KEUTUHAN_OUTPUT: "kl_divergence", COLOR_OUTPUT: "kl_divergence"},
+        loss_weights={KEUTUHAN_OUTPUT: 1.0, COLOR_OUTPUT: 0.0},
+    )
+    fused.fit(x, {KEUTUHAN_OUTPUT: y_keutuhan, COLOR_OUTPUT: y_color},
+              epochs=epochs, batch_size=batch_size, verbose=2)
+
+    # Tahap 2 (opsional): fine-tune semua layer dengan dua teacher sekaligus
+    if finetune:
+        for layer in fused.layers:
+            layer.trainable = True
+        fused.compile(
+            optimizer=keras.optimizers.Adam(1e-5),
+            loss={KEUTUHAN_OUTPUT: "kl_divergence", COLOR_OUTPUT: "kl_divergence"},
+        )
+        fused.fit(x, {KEUTUHAN_OUTPUT: y_keutuhan, COLOR_OUTPUT: y_color},
+                  epochs=max(1, epochs // 3), batch_size=batch_size, verbose=2)
+
+    pred_keutuhan, pred_color = split_outputs(fused.predict(x, verbose=0))
+    agree_keutuhan = np.mean(np.argmax(pred_keutuhan, 1) == np.argmax(y_keutuhan, 1))
+    agree_color = np.mean(np.argmax(pred_color, 1) == np.argmax(y_color, 1))
+    print(f"Agreement vs teacher: keutuhan={agree_keutuhan:.2%}  color={agree_color:.2%}")
+
+    fused.save(output_path)
+    print(f"✅ Model fused disimpan ke {output_path}")
+
+
+def main():
+    # Teacher = dua model lama, selalu di proses ini (bukan model fused)
+    os.environ["INFERENCE_MODE"] = "local"
+    os.environ["INFERENCE_BACKEND"] = "keras"
+    os.environ["FUSED_MODEL"] = "off"
+
+    from config import FUSED_MODEL_PATH
+    from utils.model_export import _list_images
+
+    parser = argparse.ArgumentParser(description="Distilasi 2 model -> 1 model fused 2 head")
+    parser.add_argument("--images", default="static/uploads")
+    parser.add_argument("--output", default=FUSED_MODEL_PATH)
+    parser.add_argument("--epochs", type=int, default=15)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--finetune", action="store_true")
+    args = parser.parse_args()
+
+    distill(_list_images(args.images), args.output, args.epochs, args.finetune, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# utils/image_io.py
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from flask import Request
+from PIL import Image, ImageOps
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import default_stream_factory
+
+from config import MAX_UPLOAD_BYTES, MAX_IMAGE_PIXELS, IMAGE_DECODE
+
+# Guard bawaan Pillow juga dipasang (DecompressionBombError saat decode)
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+_CHUNK_SIZE = 64 * 1024
+_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="upload-writer")
+
+
+class UploadRejected(ValueError):
+    """Upload ditolak (kebesaran / bukan gambar / decompression bomb)"""
+
+
+class _LimitedBuffer(io.BytesIO):
+    """Buffer file upload di memori, tolak (413) begitu lewat max_bytes"""
+
+    def __init__(self, max_bytes):
+        super().__init__()
+        self._max_bytes = max_bytes
+
+    def write(self, data):
+        if self.tell() + len(data) > self._max_bytes:
+            raise RequestEntityTooLarge(f"File lebih dari {self._max_bytes // (1024 * 1024)} MB")
+        return super().write(data)
+
+
+class UploadRequest(Request):
+    """
+    Request Flask yang membatasi tiap file upload SAAT form multipart di-parse:
+    file gambar ditampung di memori (bukan SpooledTemporaryFile yang pindah ke
+    disk di atas 500 KB) dan ditolak begitu lewat MAX_UPLOAD_BYTES, jadi tidak
+    menunggu seluruh MAX_CONTENT_LENGTH diterima dulu. Zip /upload-batch tetap
+    lewat stream bawaan Werkzeug (dibatasi MAX_CONTENT_LENGTH).
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if filename and filename.lower().endswith(".zip"):
+            return default_stream_factory(
+                total_content_length=total_content_length, content_type=content_type,
+                filename=filename, content_length=content_length,
+            )
+        return _LimitedBuffer(MAX_UPLOAD_BYTES)
+
+
+def read_upload(file_storage, max_bytes=MAX_UPLOAD_BYTES):
+    """
+    Baca isi FileStorage ke memori per chunk, berhenti begitu lewat max_bytes.
+    Batas utamanya sudah dipasang UploadRequest saat parsing; ini jaga-jaga
+    untuk max_bytes yang lebih kecil / request tanpa UploadRequest.
+    """
+    buf = io.BytesIO()
+    while True:
+        chunk = file_storage.stream.read(_CHUNK_SIZE)
+        if not chunk:
+            break
+        if buf.tell() + len(chunk) > max_bytes:
+            raise UploadRejected(f"File lebih dari {max_bytes // (1024 * 1024)} MB")
+        buf.write(chunk)
+    return buf.getvalue()
+
+
+def check_image(image_bytes, max_pixels=MAX_IMAGE_PIXELS):
+    """
+    Cek header gambar SEBELUM decode: format dikenali Pillow & jumlah pixel
+    masuk akal (guard decompression bomb). Return (width, height).
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            width, height = img.size  # cuma baca header, belum decode pixel
+    except (Image.DecompressionBombError, Image.DecompressionBombWarning):
+        raise UploadRejected("Resolusi gambar terlalu besar")
+    except Exception:
+        raise UploadRejected("File bukan gambar yang valid")
+
+    if width * height > max_pixels:
+        raise UploadRejected("Resolusi gambar terlalu besar")
+    return width, height
+
+
+def _write_file(path, data):
+    # file sementara unik per tulis: dua upload bernama sama tidak menulis ke .part yang sama
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.",
+            suffix=".part", delete=False,
+        ) as f:
+            tmp_path = f.name
+            f.write(data)
+        os.chmod(tmp_path, 0o644)  # mkstemp bikin 0600, file upload harus bisa dibaca static server
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[image_io] gagal simpan {path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def save_bytes_async(path, data):
+    """Simpan file asli di background (di luar critical path prediksi)"""
+    return _writer.submit(_write_file, path, data)
+
+
+def resize_for_model(img, size=(224, 224), mode=IMAGE_DECODE):
+    """PIL image (sudah RGB) -> array uint8 (H, W, 3) ukuran `size`"""
+    if img.size != size:
+        resample = Image.BICUBIC if mode == "fast" else Image.NEAREST
+        img = img.resize(size, resample, reducing_gap=None)
+    return np.asarray(img, dtype=np.uint8)
+
+
+def open_rgb(src, min_size=None):
+    """
+    Decode gambar penuh -> PIL RGB dengan orientasi EXIF sudah dibetulkan.
+    min_size (w, h): JPEG boleh di-decode lewat DCT scaling selama hasilnya
+    masih >= ukuran ini.
+    """
+    with Image.open(src) as img:
+        if min_size and img.format == "JPEG":
+            img.draft("RGB", min_size)
+        img = ImageOps.exif_transpose(img)
+        return img.convert("RGB")
+
+
+def decode_image(src, size=(224, 224), mode=IMAGE_DECODE):
+    """
+    Decode gambar (path / file-like) -> array uint8 (H, W, 3) ukuran `size`.
+
+    mode "fast" : JPEG di-decode langsung di resolusi kecil lewat DCT scaling
+                  (Image.draft, 1/2 - 1/8), orientasi EXIF dibetulkan, lalu
+                  SATU resize berkualitas (bicubic) ke ukuran target.
+    mode "exact": sama persis dengan keras load_img (decode penuh, resize nearest,
+                  tanpa EXIF) - dipakai kalau perlu parity 1:1 dengan training.
+    """
+    if mode == "fast":
+        # pilih skala DCT terbesar yang hasilnya masih >= size
+        return resize_for_model(open_rgb(src, size), size, mode)
+
+    with Image.open(src) as img:
+        return resize_for_model(img.convert("RGB"), size, mode)
@@ -0,0 +1,115 @@
+# utils/inference_client.py
+"""
+Client untuk utils/inference_service.py (INFERENCE_MODE = "service").
+
+Dipakai proses web: cuma butuh numpy + stdlib, TIDAK import TensorFlow.
+Koneksi ke service disimpan & dipakai ulang (satu koneksi per thread yang
+sedang aktif), kalau putus dibuka lagi sekali. Balasan ditunggu maksimal
+INFERENCE_TIMEOUT_S; lewat dari itu koneksi dibuang dan TimeoutError.
+"""
+import threading
+from multiprocessing.connection import Client
+
+import numpy as np
+
+from config import (
+    INFERENCE_SERVICE_HOST,
+    INFERENCE_SERVICE_PORT,
+    INFERENCE_SERVICE_AUTHKEY,
+    INFERENCE_TIMEOUT_S,
+)
+
+_idle = []
+_idle_lock = threading.Lock()
+
+
+def _address():
+    return (INFERENCE_SERVICE_HOST, INFERENCE_SERVICE_PORT)
+
+
+def _checkout():
+    with _idle_lock:
+        if _idle:
+            return _idle.pop()
+    if not INFERENCE_SERVICE_AUTHKEY:
+        raise RuntimeError("INFERENCE_SERVICE_AUTHKEY belum di-set (samakan dengan inference service)")
+    return Client(_address(), authkey=INFERENCE_SERVICE_AUTHKEY.encode())
+
+
+def _checkin(conn):
+    with _idle_lock:
+        _idle.append(conn)
+
+
+def _request(message):
+    """Kirim satu pesan ke service, balikin payload. Retry sekali kalau koneksi putus."""
+    for attempt in range(2):
+        conn = _checkout()
+        try:
+            conn.send(message)
+            ready = conn.poll(INFERENCE_TIMEOUT_S)
+            if ready:
+                status, payload = conn.recv()
+        except (EOFError, OSError):
+            conn.close()
+            if attempt == 0:
+                continue
+            raise
+        if not ready:
+            # service macet: balasan telat tidak boleh nyasar ke request berikutnya
+            conn.close()
+            raise TimeoutError(f"Inference service tidak membalas dalam {INFERENCE_TIMEOUT_S}s")
+        _checkin(conn)
+        if status != "ok":
+            raise RuntimeError(f"Inference service error: {payload}")
+        return payload
+
+
+def infer(batch):
+    """
+    Batch (N, 224, 224, 3) float32 -> (keutuhan_idx, keutuhan_conf, color_idx, color_conf)
+    """
+    batch = np.ascontiguousarray(batch, dtype=np.float32)
+    keutuhan_idx, keutuhan_conf, color_idx, color_conf = _request(("infer", batch))
+    return (
+        np.asarray(keutuhan_idx),
+        np.asarray(keutuhan_conf),
+        np.asarray(color_idx),
+        np.asarray(color_conf),
+    )
+
+
+def infer_probs(batch):
+    """Batch (N, 224, 224, 3) float32 -> (prob_keutuhan[N, 2], prob_color[N, 3])"""
+    batch = np.ascontiguousarray(batch, dtype=np.float32)
+    prob_keutuhan, prob_color = _request(("probs", batch))
+    return np.asarray(prob_keutuhan), np.asarray(prob_color)
+
+
+def infer_embed(batch):
+    """
+    Batch (N, 224, 224, 3) float32 ->
+    (keutuhan_idx, keutuhan_conf, color_idx, color_conf, embeddings[N, D] | None)
+    embeddings None kalau backend service tidak punya embedding (tflite).
+    """
+    batch = np.ascontiguousarray(batch, dtype=np.float32)
+    *outputs, embeddings = _request(("embed", batch))
+    return tuple(np.asarray(a) for a in outputs) + (None if embeddings is None else np.asarray(embeddings),)
+
+
+def ping():
+    """True kalau service bisa dihubungi"""
+    try:
+        return _request(("ping", None)) == "pong"
+    except Exception as e:
+        print(f"[InferenceClient] ping error: {e}")
+        return False
+
+
+def stats():
+    """Counter scheduler di sisi service"""
+    try:
+        return _request(("stats", None))
+    except Exception as e:
+        print(f"[InferenceClient] stats error: {e}")
+        return {"error": str(e)}
@@ -0,0 +1,112 @@
+# utils/inference_scheduler.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class InferenceScheduler:
+    """
+    Micro-batching untuk request prediksi yang datang bersamaan.
+
+    Tiap request thread cukup `submit(tensor)` lalu nunggu Future-nya.
+    Satu worker thread mengumpulkan request dari queue sampai
+    `max_batch_size` terpenuhi atau `max_wait_ms` habis (dihitung dari
+    request pertama di batch), lalu memanggil `run_batch(items)` SEKALI
+    dan membagikan hasilnya ke masing-masing Future.
+
+    `run_batch` harus menerima list item dan mengembalikan list hasil
+    dengan panjang & urutan yang sama.
+    """
+
+    def __init__(self, run_batch, max_batch_size=16, max_wait_ms=5.0, name="inference-scheduler"):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "errors": 0,
+            "max_batch_size_seen": 0,
+            "last_batch_size": 0,
+        }
+
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Masukkan satu item ke antrian, return Future berisi hasilnya"""
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def stats(self):
+        """Counter untuk monitoring (queue depth, ukuran batch, dll)"""
+        with self._lock:
+            data = dict(self._stats)
+        data["queue_depth"] = self._queue.qsize()
+        data["avg_batch_size"] = (
+            round(data["requests"] / data["batches"], 2) if data["batches"] else 0.0
+        )
+        data["max_batch_size"] = self.max_batch_size
+        data["max_wait_ms"] = self.max_wait_s * 1000.0
+        return data
+
+    def _collect_batch(self):
+        """Blok sampai ada 1 request, lalu kumpulkan sisanya sampai penuh / timeout"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_s
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # masih ambil yang sudah nunggu di queue, tanpa blocking
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect_batch()
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+
+            try:
+                results = list(self.run_batch(items))
+            except Exception as e:
+                print(f"[InferenceScheduler] batch error: {e}")
+                with self._lock:
+                    self._stats["errors"] += 1
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            with self._lock:
+                self._stats["requests"] += len(items)
+                self._stats["batches"] += 1
+                self._stats["last_batch_size"] = len(items)
+                self._stats["max_batch_size_seen"] = max(
+                    self._stats["max_batch_size_seen"], len(items)
+                )
+
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+            if len(results) < len(futures):
+                # hasil kurang: Future sisanya harus tetap selesai, jangan sampai caller nunggu selamanya
+                error = RuntimeError(f"run_batch mengembalikan {len(results)} hasil untuk {len(futures)} item")
+                print(f"[InferenceScheduler] {error}")
+                with self._lock:
+                    self._stats["errors"] += 1
+                for future in futures[len(results):]:
+                    future.set_exception(error)
@@ -0,0 +1,142 @@
+# utils/inference_service.py
+"""
+Inference service: proses terpisah yang memegang model Keras.
+
+Jalankan di tiap node (sekali saja, dipakai bareng semua worker web):
+
+    python -m utils.inference_service --workers 2
+
+lalu set INFERENCE_MODE=service di .env worker web. Worker web cuma
+preprocess gambar (Pillow + numpy) dan kirim tensor lewat socket lokal,
+jadi tidak perlu import TensorFlow / load model sendiri.
+
+Socket di-bind sekali di proses induk, lalu di-fork ke N worker proses.
+Tiap worker load model SETELAH fork dan punya InferenceScheduler sendiri,
+jadi request dari beberapa worker web tetap digabung jadi satu batch.
+
+INFERENCE_SERVICE_AUTHKEY wajib di-set: pesan dikirim sebagai pickle, jadi
+key adalah satu-satunya pengaman. Tanpa key service menolak jalan.
+"""
+import argparse
+import ipaddress
+import os
+import threading
+from multiprocessing.connection import Listener
+
+# Proses ini selalu pegang model sendiri (jangan sampai manggil dirinya lagi)
+os.environ["INFERENCE_MODE"] = "local"
+
+import numpy as np  # noqa: E402
+
+from config import (  # noqa: E402
+    INFERENCE_SERVICE_HOST,
+    INFERENCE_SERVICE_PORT,
+    INFERENCE_SERVICE_AUTHKEY,
+    INFERENCE_TIMEOUT_S,
+)
+
+
+def _handle_connection(conn, scheduler):
+    """Loop satu koneksi client: ("infer"|"probs"|"embed"|"ping"|"stats", payload) -> ("ok"|"error", payload)"""
+    from utils import ml_utils
+
+    try:
+        while True:
+            try:
+                command, payload = conn.recv()
+            except EOFError:
+                break
+
+            try:
+                if command == "infer":
+                    futures = [scheduler.submit(item) for item in payload]
+                    rows = [f.result(timeout=INFERENCE_TIMEOUT_S) for f in futures]
+                    keutuhan_idx, keutuhan_conf, color_idx, color_conf = (
+                        np.array(col) for col in zip(*rows)
+                    )
+                    conn.send(("ok", (keutuhan_idx, keutuhan_conf, color_idx, color_conf)))
+                elif command == "probs":
+                    # batch multi-view sudah utuh, langsung ke model (tanpa scheduler)
+                    conn.send(("ok", ml_utils._infer_probs_local(payload)))
+                elif command == "embed":
+                    conn.send(("ok", ml_utils._infer_embed_local(payload)))
+                elif command == "ping":
+                    conn.send(("ok", "pong"))
+                elif command == "stats":
+                    conn.send(("ok", {"pid": os.getpid(), **scheduler.stats()}))
+                else:
+                    conn.send(("error", f"unknown command {command!r}"))
+            except Exception as e:
+                print(f"[InferenceService] {command} error: {e}")
+                conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
+def _serve(listener):
+    """Dijalankan di tiap worker proses (setelah fork)"""
+    from utils import ml_utils
+
+    ml_utils.warm_up_models()
+    scheduler = ml_utils.get_scheduler()
+    print(f"[InferenceService] worker {os.getpid()} siap")
+
+    while True:
+        conn = listener.accept()
+        threading.Thread(
+            target=_handle_connection, args=(conn, scheduler), daemon=True
+        ).start()
+
+
+def _check_security(host, authkey):
+    """Tolak jalan tanpa authkey; bind non-loopback juga butuh key (dan diberi peringatan)"""
+    if not authkey:
+        raise SystemExit(
+            "INFERENCE_SERVICE_AUTHKEY belum di-set. Isi dengan rahasia acak "
+            "(mis. `python -c 'import secrets; print(secrets.token_hex(32))'`) "
+            "di service dan di worker web."
+        )
+    try:
+        loopback = host == "localhost" or ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        print(f"⚠️ [InferenceService] bind ke {host} (bukan loopback): pastikan port tidak terbuka ke publik")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EggVision inference service")
+    parser.add_argument("--host", default=INFERENCE_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=INFERENCE_SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="jumlah proses yang pegang model")
+    args = parser.parse_args()
+
+    _check_security(args.host, INFERENCE_SERVICE_AUTHKEY)
+    listener = Listener((args.host, args.port), authkey=INFERENCE_SERVICE_AUTHKEY.encode())
+    print(f"[InferenceService] listen di {args.host}:{args.port} ({args.workers} worker)")
+
+    if args.workers <= 1:
+        _serve(listener)
+        return
+
+    children = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _serve(listener)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+
+
+if __name__ == "__main__":
+    main()
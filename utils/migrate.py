@@ -0,0 +1,250 @@
+# utils/migrate.py
+"""
+Migrasi skema bernomor (pengganti init_db yang CREATE TABLE tiap boot).
+
+File ada di folder migrations/: NNNN_nama.py dengan fungsi up(cur) dan
+down(cur). Versi yang sudah jalan dicatat di tabel schema_version.
+
+    python -m utils.migrate status
+    python -m utils.migrate up              # sampai versi terbaru
+    python -m utils.migrate up --to 2
+    python -m utils.migrate down            # mundur 1 versi
+    python -m utils.migrate down --to 0     # kosongkan (hati-hati!)
+    python -m utils.migrate new add_index_x # bikin file migrasi kosong
+
+Saat boot app cukup check_schema(): satu SELECT MAX(version) dibandingkan
+dengan nomor file terakhir. Kalau tertinggal dan MIGRATE_ON_BOOT=true,
+migrasi dijalankan (dikunci GET_LOCK supaya worker lain menunggu).
+
+Catatan: DDL MySQL auto-commit, jadi migrasi tidak atomic. Versi dicatat
+setelah up() satu file selesai; kalau gagal di tengah, perbaiki lalu
+jalankan ulang (pakai IF NOT EXISTS / IF EXISTS di DDL).
+"""
+import argparse
+import importlib
+import os
+import re
+
+import mysql.connector
+
+from config import MIGRATE_ON_BOOT
+from utils.database import get_db_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+_FILE_RE = re.compile(r"^(\d{4})_(\w+)\.py$")
+_LOCK_NAME = "eggvision_migrate"
+_LOCK_TIMEOUT_S = 60
+
+
+def list_migrations():
+    """[(version, name, module_name)] urut naik"""
+    found = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _FILE_RE.match(filename)
+        if match:
+            found.append((int(match.group(1)), match.group(2), filename[:-3]))
+    found.sort()
+    versions = [v for v, _, _ in found]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError("Nomor migrasi dobel di folder migrations/")
+    return found
+
+
+def latest_version():
+    migrations = list_migrations()
+    return migrations[-1][0] if migrations else 0
+
+
+def _ensure_version_table(cur):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def current_version(cur):
+    """Versi skema di DB (0 kalau belum pernah migrasi)"""
+    try:
+        cur.execute("SELECT MAX(version) FROM schema_version")
+    except mysql.connector.Error as e:
+        if e.errno == 1146:  # ER_NO_SUCH_TABLE
+            return 0
+        raise
+    row = cur.fetchone()
+    return row[0] or 0
+
+
+def _load(module_name):
+    return importlib.import_module(f"migrations.{module_name}")
+
+
+def _with_lock(cur, fn):
+    cur.execute("SELECT GET_LOCK(%s, %s)", (_LOCK_NAME, _LOCK_TIMEOUT_S))
+    if cur.fetchone()[0] != 1:
+        raise RuntimeError("Migrasi lain sedang berjalan (GET_LOCK timeout)")
+    try:
+        return fn()
+    finally:
+        cur.execute("SELECT RELEASE_LOCK(%s)", (_LOCK_NAME,))
+        cur.fetchone()
+
+
+def upgrade(target=None):
+    """Jalankan up() semua migrasi > versi sekarang sampai target (default terbaru)"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError("Tidak bisa konek ke database")
+    try:
+        cur = conn.cursor()
+
+        def run():
+            _ensure_version_table(cur)
+            version = current_version(cur)
+            applied = []
+            for number, name, module_name in list_migrations():
+                if number <= version or (target is not None and number > target):
+                    continue
+                print(f"▶ migrasi {number:04d}_{name} (up)")
+                _load(module_name).up(cur)
+                cur.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", (number, name))
+                conn.commit()
+                applied.append(number)
+            return applied
+
+        applied = _with_lock(cur, run)
+        cur.close()
+        return applied
+    finally:
+        conn.close()
+
+
+def downgrade(target):
+    """Jalankan down() migrasi > target, dari yang terbaru"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError("Tidak bisa konek ke database")
+    try:
+        cur = conn.cursor()
+
+        def run():
+            _ensure_version_table(cur)
+            version = current_version(cur)
+            reverted = []
+            for number, name, module_name in reversed(list_migrations()):
+                if number > version or number <= target:
+                    continue
+                print(f"◀ migrasi {number:04d}_{name} (down)")
+                _load(module_name).down(cur)
+                cur.execute("DELETE FROM schema_version WHERE version = %s", (number,))
+                conn.commit()
+                reverted.append(number)
+            return reverted
+
+        reverted = _with_lock(cur, run)
+        cur.close()
+        return reverted
+    finally:
+        conn.close()
+
+
+def check_schema():
+    """
+    Dipanggil saat boot: bandingkan versi DB dengan file migrasi terakhir.
+    Tertinggal + MIGRATE_ON_BOOT -> upgrade(); selain itu cuma peringatan.
+    """
+    latest = latest_version()
+    conn = get_db_connection()
+    if not conn:
+        print("❌ Failed to connect to database")
+        return False
+    try:
+        cur = conn.cursor()
+        version = current_version(cur)
+        cur.close()
+    except mysql.connector.Error as e:
+        print(f"❌ Cek versi skema gagal: {e}")
+        return False
+    finally:
+        conn.close()
+
+    if version >= latest:
+        return True
+    if not MIGRATE_ON_BOOT:
+        print(f"⚠️ Skema DB versi {version}, terbaru {latest}: jalankan `python -m utils.migrate up`")
+        return False
+
+    try:
+        applied = upgrade()
+    except (mysql.connector.Error, RuntimeError) as e:
+        print(f"❌ Migrasi gagal: {e}")
+        return False
+    if applied:
+        print(f"✅ Migrasi {', '.join(f'{v:04d}' for v in applied)} selesai")
+    return True
+
+
+def _new_migration(name):
+    number = latest_version() + 1
+    slug = re.sub(r"\W+", "_", name.strip().lower()).strip("_")
+    path = os.path.join(MIGRATIONS_DIR, f"{number:04d}_{slug}.py")
+    with open(path, "w") as f:
+        f.write(
+            f'# migrations/{number:04d}_{slug}.py\n'
+            f'"""{name}"""\n\n\n'
+            'def up(cur):\n    pass\n\n\n'
+            'def down(cur):\n    pass\n'
+        )
+    print(f"✅ {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrasi skema database EggVision")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="versi DB vs migrasi yang ada")
+    p_up = sub.add_parser("up", help="jalankan migrasi yang belum")
+    p_up.add_argument("--to", type=int, default=None)
+    p_down = sub.add_parser("down", help="batalkan migrasi")
+    p_down.add_argument("--to", type=int, default=None, help="default: mundur 1 versi")
+    p_new = sub.add_parser("new", help="bikin file migrasi baru")
+    p_new.add_argument("name")
+    args = parser.parse_args()
+
+    if args.command == "new":
+        _new_migration(args.name)
+        return
+
+    if args.command == "up":
+        applied = upgrade(args.to)
+        print(f"✅ {len(applied)} migrasi dijalankan" if applied else "Skema sudah terbaru")
+        return
+
+    conn = get_db_connection()
+    if not conn:
+        raise SystemExit("Tidak bisa konek ke database")
+    try:
+        cur = conn.cursor()
+        version = current_version(cur)
+        cur.close()
+    finally:
+        conn.close()
+
+    if args.command == "down":
+        if args.to is None:
+            applied = [number for number, _, _ in list_migrations() if number <= version]
+            target = applied[-2] if len(applied) > 1 else 0
+        else:
+            target = args.to
+        reverted = downgrade(max(0, target))
+        print(f"✅ {len(reverted)} migrasi dibatalkan" if reverted else "Tidak ada yang dibatalkan")
+        return
+
+    print(f"Versi DB: {version}")
+    for number, name, _ in list_migrations():
+        print(f"  [{'x' if number <= version else ' '}] {number:04d}_{name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,569 @@
+import hashlib
+import io
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import load_img, img_to_array
+
+from config import (
+    INFERENCE_MODE,
+    INFERENCE_BACKEND,
+    MODEL_KEUTUHAN_PATH,
+    MODEL_COLOR_PATH,
+    TFLITE_KEUTUHAN_PATH,
+    TFLITE_COLOR_PATH,
+    INFERENCE_BATCHING,
+    INFERENCE_MAX_BATCH_SIZE,
+    INFERENCE_MAX_WAIT_MS,
+    INFERENCE_TIMEOUT_S,
+    PREDICTION_CACHE_SIZE,
+    PREDICTION_CACHE_PERSIST,
+    COLOR_CASCADE,
+    COLOR_CASCADE_MARGIN,
+    FUSED_MODEL,
+    FUSED_MODEL_PATH,
+    INFERENCE_COMPILED,
+    INFERENCE_PARALLEL,
+    INFERENCE_PARALLEL_WORKERS,
+    INFERENCE_INTRA_OP_THREADS,
+    INFERENCE_INTER_OP_THREADS,
+    IMAGE_DECODE,
+    EMBEDDING_STORE,
+)
+from utils import color_rules
+from utils.image_io import decode_image, resize_for_model
+from utils.inference_scheduler import InferenceScheduler
+from utils.prediction_cache import PredictionCache
 
 # ====== MODEL & LABELS ======
-# Sesuaikan path ini dengan path di server/dev-mu
-model_keutuhan = load_model('/home/arandadio/Dio Aranda/[0] Perkuliahan/Semester 5/Rekayasa Perangkat Lunak (1 - 2)/Proyek Akhir (PBL)/eggvision-flask/static/model_keutuhan.keras')
-model_color    = load_model('/home/arandadio/Dio Aranda/[0] Perkuliahan/Semester 5/Rekayasa Perangkat Lunak (1 - 2)/Proyek Akhir (PBL)/eggvision-flask/static/cangkang-cnn.keras')
+# INFERENCE_MODE = "local"   -> model di-load di proses ini
+# INFERENCE_MODE = "service" -> model dipegang utils/inference_service.py,
+#                               proses web TIDAK import TensorFlow sama sekali
+#
+# INFERENCE_BACKEND = "keras"  -> file .keras lewat model.predict
+# INFERENCE_BACKEND = "tflite" -> file .tflite hasil `python -m utils.model_export export`
+#
+# Kalau FUSED_MODEL_PATH ada (backend keras), cukup load 1 model fused dengan
+# 2 head (keutuhan + color) -> satu forward pass per telur. Lihat utils/fused_model.py
+
+#
+# Model TIDAK di-load saat import: load_models() dipanggil otomatis saat
+# prediksi pertama, atau lebih awal lewat hook warm-up (MODEL_PRELOAD di app.py).
+# Path diatur dari config.py (MODEL_KEUTUHAN_PATH / MODEL_COLOR_PATH).
+model_keutuhan = None
+model_color    = None
+model_fused    = None
+
+# Flag readiness: True setelah model selesai di-load di proses ini
+models_loaded = False
+model_load_time_s = None
+_models_lock = threading.Lock()
+
+# id(model) -> CompiledKerasModel; model_* tetap objek Keras asli (dipakai tool export/distilasi)
+_compiled = {}
+
+
+def _configure_tf_threads():
+    """
+    Batasi thread pool TensorFlow (harus sebelum op pertama jalan). Setting
+    ini global untuk seluruh proses: kedua model berbagi pool yang sama.
+    """
+    if not (INFERENCE_INTRA_OP_THREADS or INFERENCE_INTER_OP_THREADS):
+        return
+    import tensorflow as tf
+
+    try:
+        if INFERENCE_INTRA_OP_THREADS:
+            tf.config.threading.set_intra_op_parallelism_threads(INFERENCE_INTRA_OP_THREADS)
+        if INFERENCE_INTER_OP_THREADS:
+            tf.config.threading.set_inter_op_parallelism_threads(INFERENCE_INTER_OP_THREADS)
+    except RuntimeError as e:
+        # TF sudah terinisialisasi di proses ini, setting tidak bisa diubah lagi
+        print(f"[ml_utils] thread TF tidak bisa diatur: {e}")
+
+
+def _tflite_threads_per_model():
+    """Jatah thread tiap interpreter TFLite saat dua model jalan paralel (None = default TFLite)"""
+    if not INFERENCE_PARALLEL:
+        return None
+    return max(1, (os.cpu_count() or 1) // max(1, INFERENCE_PARALLEL_WORKERS))
+
+
+def load_models():
+    """
+    Load model sesuai INFERENCE_MODE / INFERENCE_BACKEND, sekali per proses
+    (thread-safe). Di mode "service" tidak melakukan apa-apa.
+    """
+    global model_keutuhan, model_color, model_fused, models_loaded, model_load_time_s
+
+    if models_loaded or INFERENCE_MODE != "local":
+        return
+    with _models_lock:
+        if models_loaded:
+            return
+
+        t0 = time.perf_counter()
+        if INFERENCE_BACKEND == "keras":
+            _configure_tf_threads()
+
+        if INFERENCE_BACKEND == "keras" and FUSED_MODEL != "off" and os.path.exists(FUSED_MODEL_PATH):
+            from tensorflow.keras.models import load_model
+
+            model_fused = load_model(FUSED_MODEL_PATH)
+            if COLOR_CASCADE:
+                print("[ml_utils] COLOR_CASCADE diabaikan: model fused memakai head warna sendiri")
+        elif INFERENCE_BACKEND == "tflite":
+            from utils.tflite_backend import TFLiteModel
+
+            num_threads = INFERENCE_INTRA_OP_THREADS or _tflite_threads_per_model()
+            model_keutuhan = TFLiteModel(TFLITE_KEUTUHAN_PATH, num_threads=num_threads)
+            model_color    = TFLiteModel(TFLITE_COLOR_PATH, num_threads=num_threads)
+        else:
+            from tensorflow.keras.models import load_model
+
+            model_keutuhan = load_model(MODEL_KEUTUHAN_PATH)
+            model_color    = load_model(MODEL_COLOR_PATH)
+
+        if INFERENCE_COMPILED and INFERENCE_BACKEND == "keras":
+            from utils.compiled_model import CompiledKerasModel
+
+            for model in (model_keutuhan, model_color, model_fused):
+                if model is not None:
+                    _compiled[id(model)] = CompiledKerasModel(model)
+
+        model_load_time_s = time.perf_counter() - t0
+        models_loaded = True
+        print(f"[ml_utils] model siap ({INFERENCE_BACKEND}) dalam {model_load_time_s:.2f}s")
+
+
+# Warm-up: dummy batch di semua ukuran batch yang dipakai scheduler, supaya
+# tracing graph & alokasi memori tidak kena ke scan pertama operator
+models_warm = False
+warm_up_error = None       # pesan error warm-up terakhir (ditampilkan di /readyz)
+_warm_up_thread = None
+_warm_up_failed_at = None
+_WARM_UP_RETRY_S = 30      # jeda sebelum warm-up yang gagal dicoba lagi
+# dummy batch warm-up tidak dihitung di cascade_stats
+_warm_up_local = threading.local()
+
+
+def warm_up_models(batch_sizes=None):
+    """Load model + jalankan dummy batch (default ukuran 1..INFERENCE_MAX_BATCH_SIZE)"""
+    global models_warm
+
+    if INFERENCE_MODE != "local":
+        return
+    load_models()
+
+    t0 = time.perf_counter()
+    sizes = batch_sizes or range(1, INFERENCE_MAX_BATCH_SIZE + 1)
+    _warm_up_local.active = True
+    try:
+        for n in sizes:
+            _infer_batch_local(np.zeros((n, 224, 224, 3), dtype=np.float32))
+    finally:
+        _warm_up_local.active = False
+    models_warm = True
+    print(f"[ml_utils] warm-up {len(list(sizes))} ukuran batch selesai dalam {time.perf_counter() - t0:.2f}s")
+
+
+def _run_warm_up():
+    """Target thread warm-up: gagal -> catat error & lepas thread supaya bisa dicoba lagi"""
+    global _warm_up_thread, warm_up_error, _warm_up_failed_at
+    try:
+        warm_up_models()
+        warm_up_error = None
+    except Exception as e:
+        print(f"[ml_utils] warm-up gagal: {e}")
+        warm_up_error = f"{type(e).__name__}: {e}"
+        _warm_up_failed_at = time.monotonic()
+    finally:
+        with _models_lock:
+            _warm_up_thread = None
+
+
+def start_warm_up():
+    """
+    Jalankan warm_up_models di background thread (satu per proses). Kalau
+    warm-up sebelumnya gagal, dicoba lagi paling cepat _WARM_UP_RETRY_S kemudian.
+    """
+    global _warm_up_thread
+    with _models_lock:
+        if _warm_up_thread is not None or models_warm or INFERENCE_MODE != "local":
+            return _warm_up_thread
+        if _warm_up_failed_at is not None and time.monotonic() - _warm_up_failed_at < _WARM_UP_RETRY_S:
+            return None
+        _warm_up_thread = threading.Thread(target=_run_warm_up, name="model-warm-up", daemon=True)
+        _warm_up_thread.start()
+        return _warm_up_thread
+
+
+def models_ready():
+    """Readiness: model sudah di-load & di-warm-up (local) / inference service bisa dihubungi (service)"""
+    if INFERENCE_MODE == "service":
+        from utils import inference_client
+        return inference_client.ping()
+    return models_warm
+
+
+def _keras_model_paths():
+    """File .keras yang di-load load_models(): model fused, atau dua model terpisah"""
+    if FUSED_MODEL != "off" and os.path.exists(FUSED_MODEL_PATH):
+        return [FUSED_MODEL_PATH]
+    return [MODEL_KEUTUHAN_PATH, MODEL_COLOR_PATH]
+
+
+def _file_stamps(paths):
+    return [
+        f"{path}@{int(os.path.getmtime(path)) if os.path.exists(path) else 'missing'}"
+        for path in paths
+    ]
+
+
+def _model_fingerprint():
+    """
+    Identitas model + preprocessing untuk key prediction_cache: backend, file
+    model yang dipakai (path + mtime), mode decode, dan setting cascade warna.
+    """
+    if INFERENCE_BACKEND == "tflite":
+        paths = [TFLITE_KEUTUHAN_PATH, TFLITE_COLOR_PATH]
+    else:
+        paths = _keras_model_paths()
+
+    parts = [INFERENCE_BACKEND, f"decode={IMAGE_DECODE}", f"cascade={COLOR_CASCADE}:{COLOR_CASCADE_MARGIN}"]
+    return "|".join(parts + _file_stamps(paths))
+
+
+def embedding_fingerprint():
+    """
+    Identitas ruang embedding untuk embedding store: cuma file model keras
+    (fused vs dua model, path + mtime). Embedding selalu dari backend keras,
+    dan mode decode / cascade tidak mengubah ruang vektornya.
+    """
+    return "|".join(_file_stamps(_keras_model_paths()))
+
+
+# Cache hasil prediksi per sha256 isi gambar (upload ulang foto yang sama),
+# dipisah per model/config supaya ganti model tidak menyajikan grade lama
+prediction_cache = PredictionCache(
+    PREDICTION_CACHE_SIZE, persist=PREDICTION_CACHE_PERSIST, fingerprint=_model_fingerprint()
+)
 
 # Label untuk masing-masing model
 CLASS_NAMES_KEUTUHAN = ["Retak", "Utuh"]
 CLASS_NAMES_COLOR    = ["Brown", "DarkBrown", "LightBrown"]  # urutan harus sama dengan training
 
 
-def _preprocess_image(file_path):
-    """Helper: load + preprocess image"""
-    img = load_img(file_path, target_size=(224, 224))
-    img_array = img_to_array(img)
+def _preprocess_image(file_path, decode_mode=None):
+    """
+    Helper: load + preprocess image -> tensor (1, 224, 224, 3) float32
+
+    Decode lewat image_io.decode_image (Pillow, tanpa TensorFlow); mode
+    "fast" / "exact" diatur IMAGE_DECODE di config.py.
+    """
+    img = decode_image(file_path, (224, 224), decode_mode or IMAGE_DECODE)
+    img_array = img.astype(np.float32)
     img_array = np.expand_dims(img_array, axis=0) / 255.0
     return img_array
 
 
+def _run_model(model, batch):
+    """Forward pass: jalur compiled kalau ada, selain itu model.predict tanpa progress bar"""
+    compiled = _compiled.get(id(model))
+    if compiled is not None:
+        return compiled.predict(batch)
+    return model.predict(batch, verbose=0)
+
+
+def _predict_probs(model, batch):
+    """Satu forward pass untuk batch (N, 224, 224, 3) -> (class_idx[N], confidence%[N])"""
+    pred = _run_model(model, batch)
+    class_idx = np.argmax(pred, axis=1)
+    confidence = np.max(pred, axis=1).astype(np.float64) * 100
+    return class_idx, confidence
+
+
+# Berapa kali tiap tahap cascade warna yang memutuskan (per proses)
+cascade_stats = {"hsv": 0, "cnn": 0}
+_cascade_lock = threading.Lock()
+
+
+def _predict_color_cascade(batch):
+    """
+    Tahap 1: aturan HSV NumPy (color_rules) untuk semua gambar.
+    Tahap 2: CNN warna HANYA untuk gambar yang margin HSV-nya < COLOR_CASCADE_MARGIN
+             atau bukan coklat menurut aturan.
+    """
+    hsv_idx, margin = color_rules.classify_color_hsv(batch)
+    use_hsv = (hsv_idx != color_rules.UNKNOWN) & (margin >= COLOR_CASCADE_MARGIN)
+
+    color_idx = hsv_idx.copy()
+    color_conf = color_rules.hsv_confidence(margin)
+
+    need_cnn = ~use_hsv
+    if need_cnn.any():
+        cnn_idx, cnn_conf = _predict_probs(model_color, batch[need_cnn])
+        color_idx[need_cnn] = cnn_idx
+        color_conf[need_cnn] = cnn_conf
+
+    if not getattr(_warm_up_local, "active", False):
+        with _cascade_lock:
+            cascade_stats["hsv"] += int(use_hsv.sum())
+            cascade_stats["cnn"] += int(need_cnn.sum())
+    return color_idx, color_conf
+
+
+def _predict_fused(batch):
+    """Satu forward pass model fused -> (keutuhan_idx, keutuhan_conf, color_idx, color_conf)"""
+    from utils.fused_model import split_outputs
+
+    prob_keutuhan, prob_color = split_outputs(_run_model(model_fused, batch))
+    return (
+        np.argmax(prob_keutuhan, axis=1),
+        np.max(prob_keutuhan, axis=1).astype(np.float64) * 100,
+        np.argmax(prob_color, axis=1),
+        np.max(prob_color, axis=1).astype(np.float64) * 100,
+    )
+
+
+# Pool kecil untuk menjalankan model keutuhan paralel dengan model warna
+_parallel_pool = None
+
+
+def _get_parallel_pool():
+    global _parallel_pool
+    if _parallel_pool is None:
+        with _models_lock:
+            if _parallel_pool is None:
+                _parallel_pool = ThreadPoolExecutor(
+                    max_workers=INFERENCE_PARALLEL_WORKERS, thread_name_prefix="model-parallel"
+                )
+    return _parallel_pool
+
+
+def _predict_color(batch):
+    if COLOR_CASCADE:
+        return _predict_color_cascade(batch)
+    return _predict_probs(model_color, batch)
+
+
+def _infer_batch_local(batch):
+    """Kedua model di proses ini -> (keutuhan_idx, keutuhan_conf, color_idx, color_conf)"""
+    load_models()
+    if model_fused is not None:
+        return _predict_fused(batch)
+
+    if INFERENCE_PARALLEL:
+        # keutuhan di pool, warna di thread ini -> dua model jalan bersamaan
+        keutuhan_future = _get_parallel_pool().submit(_predict_probs, model_keutuhan, batch)
+        color_idx, color_conf = _predict_color(batch)
+        keutuhan_idx, keutuhan_conf = keutuhan_future.result()
+    else:
+        keutuhan_idx, keutuhan_conf = _predict_probs(model_keutuhan, batch)
+        color_idx, color_conf = _predict_color(batch)
+    return keutuhan_idx, keutuhan_conf, color_idx, color_conf
+
+
+def _infer_batch(batch):
+    """
+    Jalankan kedua model untuk satu batch (N, 224, 224, 3).
+    Di mode "service" tensor dikirim ke inference service lewat socket lokal.
+    """
+    if INFERENCE_MODE == "service":
+        from utils import inference_client
+        return inference_client.infer(batch)
+    return _infer_batch_local(batch)
+
+
+def _infer_probs_local(batch):
+    """
+    Kedua model di proses ini -> (prob_keutuhan[N, 2], prob_color[N, 3]).
+    Probabilitas lengkap (tanpa cascade HSV), dipakai fusi multi-kamera.
+    """
+    load_models()
+    if model_fused is not None:
+        from utils.fused_model import split_outputs
+        prob_keutuhan, prob_color = split_outputs(_run_model(model_fused, batch))
+    elif INFERENCE_PARALLEL:
+        keutuhan_future = _get_parallel_pool().submit(_run_model, model_keutuhan, batch)
+        prob_color = _run_model(model_color, batch)
+        prob_keutuhan = keutuhan_future.result()
+    else:
+        prob_keutuhan = _run_model(model_keutuhan, batch)
+        prob_color = _run_model(model_color, batch)
+    return np.asarray(prob_keutuhan, dtype=np.float64), np.asarray(prob_color, dtype=np.float64)
+
+
+def _infer_probs(batch):
+    """Seperti _infer_batch, tapi balikin probabilitas lengkap tiap kelas"""
+    if INFERENCE_MODE == "service":
+        from utils import inference_client
+        return inference_client.infer_probs(batch)
+    return _infer_probs_local(batch)
+
+
+# Model dua output (embedding penultimate + output asli), dibuat dari model
+# yang sudah di-load -> embedding didapat di forward pass yang sama
+_embedding_models = None
+
+
+def _get_embedding_models():
+    global _embedding_models
+    load_models()
+    if _embedding_models is not None:
+        return _embedding_models
+    if INFERENCE_BACKEND != "keras":
+        raise RuntimeError("Embedding store butuh INFERENCE_BACKEND=keras")
+
+    with _models_lock:
+        if _embedding_models is None:
+            import keras
+
+            if model_fused is not None:
+                from utils.fused_model import KEUTUHAN_OUTPUT, COLOR_OUTPUT
+
+                head_k = model_fused.get_layer(KEUTUHAN_OUTPUT)
+                head_c = model_fused.get_layer(COLOR_OUTPUT)
+                models = [keras.Model(model_fused.inputs, [head_k.input, head_k.output, head_c.output])]
+            else:
+                models = [
+                    keras.Model(model.inputs, [model.layers[-2].output, model.output])
+                    for model in (model_keutuhan, model_color)
+                ]
+
+            if INFERENCE_COMPILED:
+                from utils.compiled_model import CompiledKerasModel
+
+                models = [CompiledKerasModel(m) for m in models]
+            _embedding_models = models
+    return _embedding_models
+
+
+_embedding_warned = False
+
+
+def embeddings_available():
+    """Embedding cuma bisa diambil dari model Keras (di proses ini / di inference service)"""
+    return INFERENCE_MODE == "service" or INFERENCE_BACKEND == "keras"
+
+
+def _infer_embed_local(batch):
+    """
+    Seperti _infer_batch_local, plus embedding per gambar:
+    -> (keutuhan_idx, keutuhan_conf, color_idx, color_conf, embeddings[N, D] float32)
+    Fused: fitur backbone; dua model: [fitur keutuhan | fitur warna].
+    Backend tanpa embedding (tflite): inference biasa, embeddings = None.
+    """
+    global _embedding_warned
+    if INFERENCE_BACKEND != "keras":
+        if not _embedding_warned:
+            _embedding_warned = True
+            print(f"[ml_utils] EMBEDDING_STORE diabaikan: backend {INFERENCE_BACKEND} tidak punya embedding")
+        return (*_infer_batch_local(batch), None)
+
+    models = _get_embedding_models()
+    if len(models) == 1:
+        features, prob_keutuhan, prob_color = models[0].predict(batch, verbose=0)
+    else:
+        feat_k, prob_keutuhan = models[0].predict(batch, verbose=0)
+        feat_c, prob_color = models[1].predict(batch, verbose=0)
+        features = np.concatenate(
+            [np.reshape(feat_k, (len(batch), -1)), np.reshape(feat_c, (len(batch), -1))], axis=1
+        )
+    return (
+        np.argmax(prob_keutuhan, axis=1),
+        np.max(prob_keutuhan, axis=1).astype(np.float64) * 100,
+        np.argmax(prob_color, axis=1),
+        np.max(prob_color, axis=1).astype(np.float64) * 100,
+        np.reshape(features, (len(batch), -1)).astype(np.float32),
+    )
+
+
+def _infer_embed(batch):
+    if INFERENCE_MODE == "service":
+        from utils import inference_client
+        return inference_client.infer_embed(batch)
+    return _infer_embed_local(batch)
+
+
+def _infer_items(tensors):
+    """
+    run_batch untuk InferenceScheduler: list tensor (224, 224, 3) -> list
+    (keutuhan_idx, keutuhan_conf, color_idx, color_conf) per tensor.
+    """
+    keutuhan_idx, keutuhan_conf, color_idx, color_conf = _infer_batch_local(
+        np.stack(tensors, axis=0)
+    )
+    return [
+        (int(keutuhan_idx[i]), float(keutuhan_conf[i]), int(color_idx[i]), float(color_conf[i]))
+        for i in range(len(tensors))
+    ]
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Scheduler micro-batching (dibuat sekali per proses, saat pertama dipakai)"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = InferenceScheduler(
+                    _infer_items,
+                    max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+                    max_wait_ms=INFERENCE_MAX_WAIT_MS,
+                )
+    return _scheduler
+
+
+def get_inference_stats():
+    """Counter queue depth & ukuran batch, kosong kalau batching mati / belum dipakai"""
+    data = {
+        "mode": INFERENCE_MODE,
+        "enabled": INFERENCE_BATCHING,
+        "models_loaded": models_loaded,
+        "models_warm": models_warm,
+        "model_load_time_s": model_load_time_s,
+    }
+    if INFERENCE_MODE == "service":
+        from utils import inference_client
+        data.update(inference_client.stats())
+    elif _scheduler is not None:
+        data.update(_scheduler.stats())
+    data["cache"] = prediction_cache.stats()
+    if COLOR_CASCADE:
+        with _cascade_lock:
+            data["color_cascade"] = {
+                "margin": COLOR_CASCADE_MARGIN,
+                # model fused: warna selalu dari head fused, cascade tidak dipakai
+                "active": model_fused is None,
+                **cascade_stats,
+            }
+    return data
+
+
+def _infer_single(img_array):
+    """
+    Satu gambar (1, 224, 224, 3) -> (keutuhan_idx, keutuhan_conf, color_idx, color_conf).
+    Lewat scheduler kalau micro-batching aktif (mode local), selain itu langsung.
+    """
+    if INFERENCE_MODE == "local" and INFERENCE_BATCHING:
+        future = get_scheduler().submit(img_array[0])
+        return future.result(timeout=INFERENCE_TIMEOUT_S)
+
+    keutuhan_idx, keutuhan_conf, color_idx, color_conf = _infer_batch(img_array)
+    return int(keutuhan_idx[0]), float(keutuhan_conf[0]), int(color_idx[0]), float(color_conf[0])
+
+
 def predict_keutuhan_image(file_path):
     """Prediksi Retak / Utuh"""
     try:
         img_array = _preprocess_image(file_path)
-        pred = model_keutuhan.predict(img_array)
-        class_idx = np.argmax(pred)
-        prediction_label = CLASS_NAMES_KEUTUHAN[class_idx]
-        confidence = float(np.max(pred) * 100)
-        return prediction_label, confidence
+        keutuhan_idx, keutuhan_conf, _, _ = _infer_single(img_array)
+        return CLASS_NAMES_KEUTUHAN[keutuhan_idx], keutuhan_conf
     except Exception as e:
         print(f"Prediction keutuhan error: {e}")
         return None, 0.0
@@ -39,11 +573,8 @@ def predict_color_image(file_path):
     """Prediksi Brown / DarkBrown / LightBrown"""
     try:
         img_array = _preprocess_image(file_path)
-        pred = model_color.predict(img_array)
-        class_idx = np.argmax(pred)
-        prediction_label = CLASS_NAMES_COLOR[class_idx]
-        confidence = float(np.max(pred) * 100)
-        return prediction_label, confidence
+        _, _, color_idx, color_conf = _infer_single(img_array)
+        return CLASS_NAMES_COLOR[color_idx], color_conf
     except Exception as e:
         print(f"Prediction color error: {e}")
         return None, 0.0
@@ -90,38 +621,124 @@ def _map_grade(color_label: str, keutuhan_label: str) -> str:
         return "C"
 
 
+# Skor per index kelas (urutan sama dengan CLASS_NAMES_*), dipakai _map_grade_batch
+_COLOR_SCORES    = np.array([{"LightBrown": 2, "Brown": 1}.get(c, 0) for c in CLASS_NAMES_COLOR])
+_KEUTUHAN_SCORES = np.array([{"Utuh": 1}.get(k, 0) for k in CLASS_NAMES_KEUTUHAN])
+
+
+def _map_grade_batch(color_idx, keutuhan_idx):
+    """
+    Versi vektor dari _map_grade: array index kelas warna & keutuhan
+    -> array grade ("A"/"B"/"C"), aturan skornya sama persis.
+    """
+    total_score = _COLOR_SCORES[np.asarray(color_idx)] + _KEUTUHAN_SCORES[np.asarray(keutuhan_idx)]
+    return np.where(total_score >= 3, "A", np.where(total_score == 2, "B", "C"))
+
+
+def _predict_tensor(img_array, timings, with_embedding=False):
+    """
+    Tensor (1, 224, 224, 3) -> (grade, grade_conf, detail) tanpa cache.
+    Waktu inference dicatat ke dict `timings`. with_embedding=True menambah
+    detail["embedding"] (lewat _infer_embed, tanpa micro-batching).
+    """
+    t0 = time.perf_counter()
+    embedding = None
+    if with_embedding:
+        k_idx, k_conf, c_idx, c_conf, embeddings = _infer_embed(img_array)
+        keutuhan_idx, keutuhan_conf = int(k_idx[0]), float(k_conf[0])
+        color_idx, color_conf = int(c_idx[0]), float(c_conf[0])
+        embedding = embeddings[0] if embeddings is not None else None
+    else:
+        keutuhan_idx, keutuhan_conf, color_idx, color_conf = _infer_single(img_array)
+    timings["inference"] = (time.perf_counter() - t0) * 1000
+
+    keutuhan_label = CLASS_NAMES_KEUTUHAN[keutuhan_idx]
+    color_label = CLASS_NAMES_COLOR[color_idx]
+
+    # Kombinasikan ke Grade
+    grade = _map_grade(color_label, keutuhan_label)
+
+    # Confidence gabungan (simple average)
+    if keutuhan_conf == 0.0 and color_conf == 0.0:
+        grade_conf = 0.0
+    else:
+        grade_conf = (keutuhan_conf + color_conf) / 2.0
+
+    detail = {
+        "keutuhan": keutuhan_label,
+        "keutuhan_conf": keutuhan_conf,
+        "color": color_label,
+        "color_conf": color_conf,
+    }
+    if embedding is not None:
+        detail["embedding"] = embedding
+    return grade, grade_conf, detail
+
+
 def predict_image(file_path):
     """
-    Prediksi gabungan:
+    Prediksi gabungan dari file di disk (lihat predict_image_bytes).
+
+    Return:
+      grade (str), grade_confidence (float), detail (dict)
+    """
+    try:
+        with open(file_path, "rb") as f:
+            image_bytes = f.read()
+    except OSError as e:
+        print(f"Prediction combined error: {e}")
+        return "C", 0.0, {
+            "keutuhan": None,
+            "keutuhan_conf": 0.0,
+            "color": None,
+            "color_conf": 0.0,
+            "timings_ms": {},
+        }
+    return predict_image_bytes(image_bytes)
+
+
+def predict_image_bytes(image_bytes):
+    """
+    Prediksi gabungan langsung dari isi file di memori:
     - model_keutuhan  -> Retak / Utuh
     - model_color     -> Brown / DarkBrown / LightBrown
     -> dikombinasikan menjadi Grade A/B/C
 
+    Gambar cuma di-decode & di-resize SEKALI, lalu tensor yang sama
+    dipakai kedua model. Waktu tiap tahap (ms) ada di detail["timings_ms"].
+
+    Kalau isi file (sha256) sudah pernah diprediksi, hasil diambil dari
+    prediction_cache tanpa menyentuh model (detail["cached"] = True).
+
     Return:
       grade (str), grade_confidence (float), detail (dict)
     """
+    timings = {}
     try:
-        # 1) Prediksi masing-masing model
-        keutuhan_label, keutuhan_conf = predict_keutuhan_image(file_path)
-        color_label, color_conf = predict_color_image(file_path)
+        # 0) Hash isi file -> cek cache
+        t0 = time.perf_counter()
+        image_hash = hashlib.sha256(image_bytes).hexdigest()
+        # Embedding store aktif: embedding tidak ikut di-cache, jadi model selalu
+        # jalan (lewat _infer_embed: tanpa cache, micro-batching, maupun cascade HSV)
+        with_embedding = EMBEDDING_STORE and embeddings_available()
+        cached = None if with_embedding else prediction_cache.get(image_hash)
+        timings["cache_lookup"] = (time.perf_counter() - t0) * 1000
 
-        # 2) Kombinasikan ke Grade
-        grade = _map_grade(color_label, keutuhan_label)
+        if cached is not None:
+            grade, grade_conf, detail = cached
+            return grade, grade_conf, {**detail, "cached": True, "timings_ms": timings}
 
-        # 3) Confidence gabungan (simple average)
-        if keutuhan_conf == 0.0 and color_conf == 0.0:
-            grade_conf = 0.0
-        else:
-            grade_conf = (keutuhan_conf + color_conf) / 2.0
+        # 1) Preprocess sekali saja (decode + resize + normalisasi)
+        t0 = time.perf_counter()
+        img_array = _preprocess_image(io.BytesIO(image_bytes))
+        timings["preprocess"] = (time.perf_counter() - t0) * 1000
 
-        detail = {
-            "keutuhan": keutuhan_label,
-            "keutuhan_conf": keutuhan_conf,
-            "color": color_label,
-            "color_conf": color_conf,
-        }
+        # 2) Prediksi kedua model dari tensor yang sama -> Grade
+        grade, grade_conf, detail = _predict_tensor(img_array, timings, with_embedding)
+        if not with_embedding:
+            prediction_cache.put(image_hash, (grade, grade_conf, detail))
 
-        return grade, grade_conf, detail
+        return grade, grade_conf, {**detail, "cached": False, "timings_ms": timings}
 
     except Exception as e:
         print(f"Prediction combined error: {e}")
@@ -131,5 +748,179 @@ def predict_image(file_path):
             "keutuhan_conf": 0.0,
             "color": None,
             "color_conf": 0.0,
+            "timings_ms": timings,
+        }
+        return "C", 0.0, detail
+
+
+def predict_frame(image_bytes):
+    """
+    Prediksi satu frame kamera (JPEG/PNG terkompresi) langsung dari memori.
+    Tidak lewat prediction_cache (tiap frame beda), tidak ada file di disk.
+
+    Return:
+      grade (str), grade_confidence (float), detail (dict)
+    """
+    timings = {}
+    try:
+        t0 = time.perf_counter()
+        img_array = _preprocess_image(io.BytesIO(image_bytes))
+        timings["preprocess"] = (time.perf_counter() - t0) * 1000
+
+        grade, grade_conf, detail = _predict_tensor(img_array, timings)
+        return grade, grade_conf, {**detail, "timings_ms": timings}
+    except Exception as e:
+        print(f"Prediction frame error: {e}")
+        detail = {
+            "keutuhan": None,
+            "keutuhan_conf": 0.0,
+            "color": None,
+            "color_conf": 0.0,
+            "timings_ms": timings,
         }
         return "C", 0.0, detail
+
+
+def _fallback_result():
+    return ("C", 0.0, {
+        "keutuhan": None,
+        "keutuhan_conf": 0.0,
+        "color": None,
+        "color_conf": 0.0,
+    })
+
+
+def _predict_stacked(tensors, results, valid_idx):
+    """
+    Satu batch (tiap model 1x forward pass) -> isi results[valid_idx[j]].
+    Kalau batch gagal, results dibiarkan berisi fallback.
+    """
+    if not tensors:
+        return results
+
+    try:
+        batch = np.stack(tensors, axis=0)
+        embeddings = None
+        if EMBEDDING_STORE and embeddings_available():
+            keutuhan_idx, keutuhan_conf, color_idx, color_conf, embeddings = _infer_embed(batch)
+        else:
+            keutuhan_idx, keutuhan_conf, color_idx, color_conf = _infer_batch(batch)
+        grades = _map_grade_batch(color_idx, keutuhan_idx)
+        grade_conf = (keutuhan_conf + color_conf) / 2.0
+    except Exception as e:
+        print(f"Prediction batch error: {e}")
+        return results
+
+    for j, i in enumerate(valid_idx):
+        detail = {
+            "keutuhan": CLASS_NAMES_KEUTUHAN[keutuhan_idx[j]],
+            "keutuhan_conf": float(keutuhan_conf[j]),
+            "color": CLASS_NAMES_COLOR[color_idx[j]],
+            "color_conf": float(color_conf[j]),
+        }
+        if embeddings is not None:
+            detail["embedding"] = embeddings[j]
+        results[i] = (str(grades[j]), float(grade_conf[j]), detail)
+
+    return results
+
+
+def predict_images(file_paths):
+    """
+    Prediksi banyak gambar sekaligus (satu tray):
+    semua gambar di-stack jadi satu batch, tiap model cuma dipanggil
+    SEKALI per batch, lalu grade dihitung vektor dengan _map_grade_batch.
+
+    Gambar yang gagal di-decode tetap dapat hasil fallback Grade C
+    supaya urutan output sama dengan file_paths.
+
+    Return:
+      list of (grade, grade_confidence, detail), sejajar dengan file_paths
+    """
+    results = [_fallback_result() for _ in file_paths]
+
+    tensors, valid_idx = [], []
+    for i, path in enumerate(file_paths):
+        try:
+            tensors.append(_preprocess_image(path)[0])
+            valid_idx.append(i)
+        except Exception as e:
+            print(f"Preprocess error ({path}): {e}")
+
+    return _predict_stacked(tensors, results, valid_idx)
+
+
+def predict_crops(crops):
+    """
+    Prediksi crop telur hasil segmentasi tray (list PIL RGB) dalam satu batch.
+    Return list of (grade, grade_confidence, detail), sejajar dengan crops.
+    """
+    results = [_fallback_result() for _ in crops]
+    tensors = [resize_for_model(crop).astype(np.float32) / 255.0 for crop in crops]
+    return _predict_stacked(tensors, results, list(range(len(crops))))
+
+
+RETAK_IDX = CLASS_NAMES_KEUTUHAN.index("Retak")
+
+
+def fuse_view_probs(prob_keutuhan, prob_color):
+    """
+    Gabungkan probabilitas beberapa view (kamera) dari SATU telur.
+
+    - keutuhan: retak cukup terlihat dari satu kamera, jadi P(Retak) =
+      maksimum antar view (bukan rata-rata yang bisa "mengencerkan" retak)
+    - warna: rata-rata probabilitas antar view
+
+    Return (prob_keutuhan[2], prob_color[3]) hasil fusi.
+    """
+    p_retak = float(np.max(prob_keutuhan[:, RETAK_IDX]))
+    fused_keutuhan = np.full(len(CLASS_NAMES_KEUTUHAN), (1.0 - p_retak) / (len(CLASS_NAMES_KEUTUHAN) - 1))
+    fused_keutuhan[RETAK_IDX] = p_retak
+    fused_color = np.mean(prob_color, axis=0)
+    return fused_keutuhan, fused_color
+
+
+def predict_views(view_sources):
+    """
+    Prediksi satu telur dari beberapa kamera (mis. Kanan / Tengah / Kiri).
+    Semua view di-decode lalu jalan sebagai SATU batch di kedua model,
+    probabilitasnya difusi (fuse_view_probs) jadi satu grade.
+
+    view_sources: list path / file-like, satu per kamera.
+
+    Return:
+      grade, grade_confidence, detail (detail["views"] = hasil per view,
+      sejajar dengan view_sources)
+    """
+    try:
+        batch = np.concatenate([_preprocess_image(src) for src in view_sources], axis=0)
+        prob_keutuhan, prob_color = _infer_probs(batch)
+        fused_keutuhan, fused_color = fuse_view_probs(prob_keutuhan, prob_color)
+    except Exception as e:
+        print(f"Prediction multi-view error: {e}")
+        grade, grade_conf, detail = _fallback_result()
+        return grade, grade_conf, {**detail, "views": []}
+
+    keutuhan_idx, color_idx = int(np.argmax(fused_keutuhan)), int(np.argmax(fused_color))
+    keutuhan_conf = float(fused_keutuhan[keutuhan_idx]) * 100
+    color_conf = float(fused_color[color_idx]) * 100
+    keutuhan_label = CLASS_NAMES_KEUTUHAN[keutuhan_idx]
+    color_label = CLASS_NAMES_COLOR[color_idx]
+
+    views = [
+        {
+            "keutuhan": CLASS_NAMES_KEUTUHAN[int(np.argmax(prob_keutuhan[i]))],
+            "keutuhan_conf": float(np.max(prob_keutuhan[i])) * 100,
+            "color": CLASS_NAMES_COLOR[int(np.argmax(prob_color[i]))],
+            "color_conf": float(np.max(prob_color[i])) * 100,
+        }
+        for i in range(len(batch))
+    ]
+    detail = {
+        "keutuhan": keutuhan_label,
+        "keutuhan_conf": keutuhan_conf,
+        "color": color_label,
+        "color_conf": color_conf,
+        "views": views,
+    }
+    return _map_grade(color_label, keutuhan_label), (keutuhan_conf + color_conf) / 2.0, detail
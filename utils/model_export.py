@@ -0,0 +1,157 @@
+# utils/model_export.py
+"""
+Export model Keras ke TFLite + cek parity terhadap backend Keras.
+
+    # float32
+    python -m utils.model_export export
+    # int8 penuh, kalibrasi dari gambar di static/uploads
+    python -m utils.model_export export --int8 --calib-dir static/uploads
+    # bandingkan label & confidence Keras vs TFLite
+    python -m utils.model_export parity --images static/uploads
+
+Hasil export ditulis ke TFLITE_KEUTUHAN_PATH / TFLITE_COLOR_PATH (config.py),
+jadi tinggal set INFERENCE_BACKEND=tflite setelah parity-nya oke.
+"""
+import argparse
+import glob
+import os
+import tempfile
+
+# Tool ini selalu butuh model Keras asli di proses sendiri
+os.environ["INFERENCE_MODE"] = "local"
+os.environ["INFERENCE_BACKEND"] = "keras"
+os.environ["FUSED_MODEL"] = "off"
+
+import numpy as np  # noqa: E402
+
+from config import TFLITE_KEUTUHAN_PATH, TFLITE_COLOR_PATH  # noqa: E402
+
+IMAGE_PATTERNS = ("*.jpg", "*.jpeg", "*.png", "*.webp")
+
+
+def _list_images(folder, limit=None):
+    paths = []
+    for pattern in IMAGE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(folder, pattern)))
+    paths = sorted(paths)
+    return paths[:limit] if limit else paths
+
+
+def _representative_dataset(image_paths):
+    """Generator kalibrasi int8: satu tensor (1, 224, 224, 3) per gambar"""
+    from utils.ml_utils import _preprocess_image
+
+    def gen():
+        for path in image_paths:
+            try:
+                yield [_preprocess_image(path).astype(np.float32)]
+            except Exception as e:
+                print(f"Skip kalibrasi {path}: {e}")
+
+    return gen
+
+
+def export_tflite(model, output_path, int8=False, calib_paths=None):
+    """Keras model -> file .tflite (float32 atau int8 penuh)"""
+    import tensorflow as tf
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keras 3: lewat SavedModel dulu, from_keras_model kurang stabil
+        saved_dir = os.path.join(tmp, "saved_model")
+        model.export(saved_dir)
+        converter = tf.lite.TFLiteConverter.from_saved_model(saved_dir)
+
+        if int8:
+            if not calib_paths:
+                raise ValueError("Kuantisasi int8 butuh gambar kalibrasi (--calib-dir)")
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.representative_dataset = _representative_dataset(calib_paths)
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            converter.inference_input_type = tf.int8
+            converter.inference_output_type = tf.int8
+
+        tflite_bytes = converter.convert()
+
+    with open(output_path, "wb") as f:
+        f.write(tflite_bytes)
+    print(f"✅ {output_path} ({len(tflite_bytes) / 1024:.0f} KB, {'int8' if int8 else 'float32'})")
+
+
+def check_parity(image_paths, keutuhan_path=TFLITE_KEUTUHAN_PATH, color_path=TFLITE_COLOR_PATH):
+    """
+    Bandingkan Keras vs TFLite per gambar.
+    Return dict ringkasan: agreement label & selisih confidence (poin persen).
+    """
+    from utils import ml_utils
+    from utils.tflite_backend import TFLiteModel
+
+    ml_utils.load_models()
+
+    pairs = {
+        "keutuhan": (ml_utils.model_keutuhan, TFLiteModel(keutuhan_path)),
+        "color": (ml_utils.model_color, TFLiteModel(color_path)),
+    }
+
+    tensors = []
+    for path in image_paths:
+        try:
+            tensors.append(ml_utils._preprocess_image(path)[0])
+        except Exception as e:
+            print(f"Skip {path}: {e}")
+    if not tensors:
+        raise ValueError("Tidak ada gambar untuk parity check")
+    batch = np.stack(tensors, axis=0)
+
+    report = {"images": len(tensors)}
+    for name, (keras_model, lite_model) in pairs.items():
+        keras_idx, keras_conf = ml_utils._predict_probs(keras_model, batch)
+        lite_idx, lite_conf = ml_utils._predict_probs(lite_model, batch)
+        conf_diff = np.abs(keras_conf - lite_conf)
+        report[name] = {
+            "label_agreement": float(np.mean(keras_idx == lite_idx)),
+            "conf_diff_mean": float(np.mean(conf_diff)),
+            "conf_diff_max": float(np.max(conf_diff)),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export & parity check model EggVision")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="Keras -> TFLite")
+    p_export.add_argument("--int8", action="store_true", help="post-training int8 quantization")
+    p_export.add_argument("--calib-dir", default="static/uploads")
+    p_export.add_argument("--calib-limit", type=int, default=200)
+
+    p_parity = sub.add_parser("parity", help="Bandingkan Keras vs TFLite")
+    p_parity.add_argument("--images", default="static/uploads")
+    p_parity.add_argument("--min-agreement", type=float, default=0.98)
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from utils import ml_utils
+
+        ml_utils.load_models()
+        calib_paths = _list_images(args.calib_dir, args.calib_limit) if args.int8 else None
+        export_tflite(ml_utils.model_keutuhan, TFLITE_KEUTUHAN_PATH, args.int8, calib_paths)
+        export_tflite(ml_utils.model_color, TFLITE_COLOR_PATH, args.int8, calib_paths)
+        return
+
+    report = check_parity(_list_images(args.images))
+    print(f"Parity Keras vs TFLite ({report['images']} gambar)")
+    ok = True
+    for name in ("keutuhan", "color"):
+        r = report[name]
+        print(
+            f"  {name:<9} agreement={r['label_agreement']:.2%}  "
+            f"Δconf mean={r['conf_diff_mean']:.2f}  max={r['conf_diff_max']:.2f}"
+        )
+        ok = ok and r["label_agreement"] >= args.min_agreement
+    print("✅ Aman ganti backend" if ok else "❌ Agreement di bawah batas, jangan ganti backend dulu")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
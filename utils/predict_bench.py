@@ -0,0 +1,62 @@
+# utils/predict_bench.py
+"""
+Micro-benchmark latency per panggilan: model.predict() vs jalur compiled.
+
+    python -m utils.predict_bench --iters 200 --batch 1
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+
+def _bench(fn, batch, iters, warmup=10):
+    for _ in range(warmup):
+        fn(batch)
+    samples = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        fn(batch)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples = np.array(samples)
+    return float(np.percentile(samples, 50)), float(np.percentile(samples, 95))
+
+
+def main():
+    os.environ["INFERENCE_MODE"] = "local"
+    os.environ["INFERENCE_BACKEND"] = "keras"
+    os.environ["INFERENCE_COMPILED"] = "false"  # model_* asli, compiled dibungkus manual di sini
+
+    from utils import ml_utils
+    from utils.compiled_model import CompiledKerasModel
+
+    parser = argparse.ArgumentParser(description="Latency model.predict vs compiled")
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=1)
+    args = parser.parse_args()
+
+    ml_utils.load_models()
+    batch = np.random.rand(args.batch, 224, 224, 3).astype(np.float32)
+
+    models = {
+        "keutuhan": ml_utils.model_keutuhan,
+        "color": ml_utils.model_color,
+        "fused": ml_utils.model_fused,
+    }
+    print(f"Latency per panggilan, batch={args.batch}, {args.iters} iterasi (ms)")
+    print(f"{'model':<10} {'predict p50':>12} {'p95':>8} {'compiled p50':>13} {'p95':>8} {'speedup':>8}")
+    for name, model in models.items():
+        if model is None:
+            continue
+        compiled = CompiledKerasModel(model)
+        p50_pred, p95_pred = _bench(lambda b: model.predict(b, verbose=0), batch, args.iters)
+        p50_comp, p95_comp = _bench(compiled.predict, batch, args.iters)
+        print(
+            f"{name:<10} {p50_pred:>12.2f} {p95_pred:>8.2f} {p50_comp:>13.2f} {p95_comp:>8.2f} "
+            f"{p50_pred / p50_comp:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
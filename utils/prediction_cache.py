@@ -0,0 +1,129 @@
+# utils/prediction_cache.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import mysql.connector
+
+from utils.database import get_db_connection
+
+
+class PredictionCache:
+    """
+    Cache hasil predict_image, key = sha256 isi file gambar + `fingerprint`
+    (identitas model & preprocessing, lihat ml_utils._model_fingerprint):
+    ganti file model / backend / mode decode / cascade -> key baru, hasil
+    lama tidak dipakai lagi (baris lama di tabel boleh dihapus kapan saja).
+
+    - Memori: LRU (OrderedDict), maksimal `max_size` entri.
+    - DB (opsional, `persist=True`): tabel prediction_cache, supaya hasil
+      tetap ada setelah worker restart / dipakai bareng worker lain.
+
+    Value yang disimpan: (grade, grade_conf, detail) tanpa timings.
+    """
+
+    def __init__(self, max_size=1024, persist=False, fingerprint=""):
+        self.max_size = max(0, int(max_size))
+        self.persist = persist
+        self.fingerprint = fingerprint
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "db_hits": 0, "misses": 0, "evictions": 0}
+
+    def _key(self, image_hash):
+        if not self.fingerprint:
+            return image_hash
+        return hashlib.sha256(f"{self.fingerprint}\n{image_hash}".encode()).hexdigest()
+
+    def get(self, image_hash):
+        image_hash = self._key(image_hash)
+        with self._lock:
+            value = self._data.get(image_hash)
+            if value is not None:
+                self._data.move_to_end(image_hash)
+                self._stats["hits"] += 1
+                return value
+
+        value = self._db_get(image_hash) if self.persist else None
+
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["db_hits"] += 1
+        self._remember(image_hash, value)
+        return value
+
+    def put(self, image_hash, value):
+        image_hash = self._key(image_hash)
+        self._remember(image_hash, value)
+        if self.persist:
+            self._db_put(image_hash, value)
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data["size"] = len(self._data)
+        lookups = data["hits"] + data["db_hits"] + data["misses"]
+        data["hit_rate"] = round((data["hits"] + data["db_hits"]) / lookups, 4) if lookups else 0.0
+        data["max_size"] = self.max_size
+        data["persist"] = self.persist
+        data["fingerprint"] = self.fingerprint
+        return data
+
+    def _remember(self, image_hash, value):
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._data[image_hash] = value
+            self._data.move_to_end(image_hash)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _db_get(self, image_hash):
+        conn = get_db_connection()
+        if not conn:
+            return None
+        try:
+            cur = conn.cursor(dictionary=True)
+            cur.execute(
+                "SELECT grade, grade_conf, detail FROM prediction_cache WHERE image_hash = %s",
+                (image_hash,),
+            )
+            row = cur.fetchone()
+            cur.close()
+            if not row:
+                return None
+            return row["grade"], float(row["grade_conf"]), json.loads(row["detail"])
+        except mysql.connector.Error as e:
+            print(f"[PredictionCache] select error: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def _db_put(self, image_hash, value):
+        grade, grade_conf, detail = value
+        conn = get_db_connection()
+        if not conn:
+            return
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                INSERT INTO prediction_cache (image_hash, grade, grade_conf, detail)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    grade = VALUES(grade),
+                    grade_conf = VALUES(grade_conf),
+                    detail = VALUES(detail)
+                """,
+                (image_hash, grade, grade_conf, json.dumps(detail)),
+            )
+            conn.commit()
+            cur.close()
+        except mysql.connector.Error as e:
+            print(f"[PredictionCache] insert error: {e}")
+        finally:
+            conn.close()
@@ -27,12 +27,18 @@ def build_report_data(user_id: int):
     try:
         cur = conn.cursor(dictionary=True)
 
-        # Total data
+        # Total data + jumlah per grade, dari rollup harian (utils/scan_rollup.py)
         cur.execute(
-            "SELECT COUNT(*) AS cnt FROM egg_scans WHERE user_id = %s",
+            """
+            SELECT grade, SUM(scan_count) AS cnt
+            FROM egg_scan_daily
+            WHERE user_id = %s
+            GROUP BY grade
+            """,
             (user_id,),
         )
-        total_scans = cur.fetchone()["cnt"]
+        grade_counts_raw = {r["grade"]: int(r["cnt"]) for r in cur.fetchall()}
+        total_scans = sum(grade_counts_raw.values())
 
         # Records histori (ambil 200 terakhir)
         cur.execute(
@@ -87,17 +93,6 @@ def build_report_data(user_id: int):
         }
 
         # Ringkasan per grade untuk card di bawah grafik
-        cur.execute(
-            """
-            SELECT grade, COUNT(*) AS cnt
-            FROM egg_scans
-            WHERE user_id = %s
-            GROUP BY grade
-            """,
-            (user_id,),
-        )
-        grade_rows = cur.fetchall()
-        grade_counts_raw = {r["grade"]: r["cnt"] for r in grade_rows}
         total_for_pct = sum(grade_counts_raw.values()) or 1
 
         grade_summary = []
@@ -112,16 +107,16 @@ def build_report_data(user_id: int):
                 }
             )
 
-        # Data untuk grafik: agregasi per tanggal scan
+        # Data untuk grafik: agregasi per tanggal scan (urut primary key rollup)
         cur.execute(
             """
             SELECT
-                DATE(scanned_at) AS d,
-                COUNT(*) AS cnt
-            FROM egg_scans
+                day AS d,
+                SUM(scan_count) AS cnt
+            FROM egg_scan_daily
             WHERE user_id = %s
-            GROUP BY DATE(scanned_at)
-            ORDER BY d ASC
+            GROUP BY day
+            ORDER BY day ASC
             LIMIT 14
             """,
             (user_id,),
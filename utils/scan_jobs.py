@@ -0,0 +1,105 @@
+# utils/scan_jobs.py
+"""
+Scan async: prediksi + insert egg_scans jalan di executor worker yang
+menerima upload, status job disimpan di tabel scan_jobs (migrasi 0006)
+supaya poll / SSE / dashboard yang masuk ke worker lain tetap melihatnya.
+Job lebih tua dari SCAN_JOB_TTL_S dibuang saat submit berikutnya.
+"""
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+
+from config import SCAN_JOB_WORKERS, SCAN_JOB_TTL_S
+from utils.database import get_db_connection
+from utils.ml_utils import predict_image_bytes
+from utils.scan_store import scan_row, insert_scans
+
+_executor = ThreadPoolExecutor(max_workers=SCAN_JOB_WORKERS, thread_name_prefix="scan-job")
+
+
+def _execute(sql, params):
+    """Satu statement + commit; False kalau DB gagal"""
+    conn = get_db_connection()
+    if not conn:
+        return False
+    try:
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        conn.commit()
+        cur.close()
+        return True
+    except mysql.connector.Error as e:
+        conn.rollback()
+        print(f"Scan job error: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def _run(job_id, user_id, image_bytes, image_path):
+    """Dijalankan di executor: prediksi + insert egg_scans"""
+    try:
+        grade, grade_conf, detail = predict_image_bytes(image_bytes)
+        saved = insert_scans(
+            [scan_row(user_id, grade, grade_conf, detail, image_path)], [detail.get("embedding")]
+        )
+
+        keutuhan_pred = detail.get("keutuhan")
+        color_pred = detail.get("color")
+        result = {
+            "image_path": image_path,
+            "grade": grade,
+            "prediction": f"Grade {grade} · {keutuhan_pred or '-'} · {color_pred or '-'}",
+            "confidence": f"{grade_conf:.2f}%",
+            "saved": saved,
+        }
+        status, error = "done", None
+    except Exception as e:
+        print(f"Scan job {job_id} error: {e}")
+        result, status, error = None, "error", str(e)
+
+    _execute(
+        "UPDATE scan_jobs SET status = %s, result = %s, error = %s, finished_at = NOW() WHERE job_id = %s",
+        (status, json.dumps(result) if result is not None else None, error, job_id),
+    )
+
+
+def submit_scan(user_id, image_bytes, image_path):
+    """
+    Antrikan scan (isi gambar di memori) di background, langsung balikin job_id.
+    None kalau job tidak bisa dicatat di DB (scan tidak dijalankan).
+    """
+    _execute("DELETE FROM scan_jobs WHERE created_at < NOW() - INTERVAL %s SECOND", (SCAN_JOB_TTL_S,))
+    job_id = uuid.uuid4().hex
+    if not _execute("INSERT INTO scan_jobs (job_id, user_id) VALUES (%s, %s)", (job_id, user_id)):
+        return None
+    _executor.submit(_run, job_id, user_id, image_bytes, image_path)
+    return job_id
+
+
+def get_job(job_id, user_id=None):
+    """Snapshot status job (None kalau tidak ada / sudah kedaluwarsa / bukan milik user_id)"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cur = conn.cursor(dictionary=True)
+        cur.execute(
+            "SELECT job_id, user_id, status, result, error, created_at, finished_at "
+            "FROM scan_jobs WHERE job_id = %s",
+            (job_id,),
+        )
+        job = cur.fetchone()
+        cur.close()
+    except mysql.connector.Error as e:
+        print(f"Scan job error: {e}")
+        return None
+    finally:
+        conn.close()
+
+    if job is None or (user_id is not None and job["user_id"] != user_id):
+        return None
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
@@ -0,0 +1,184 @@
+# utils/scan_rollup.py
+"""
+Rollup harian egg_scans (tabel egg_scan_daily, migrasi 0005): jumlah scan
+dan total berat per (user, hari, grade, status).
+
+Dashboard & laporan membaca total / jumlah per grade / grafik harian dari
+sini, bukan COUNT(*) / GROUP BY atas seluruh riwayat egg_scans farm. Jumlah
+baris yang dibaca ikut jumlah hari aktif, bukan jumlah scan.
+
+Rollup diubah di transaksi yang sama dengan perubahan egg_scans:
+- insert scan   : add_scans()    (utils/scan_store.py)
+- ubah status   : move_status()  tepat sebelum UPDATE status (EggMart)
+
+Kalau ada jalur lain yang mengubah egg_scans langsung (SQL manual, dll):
+
+    python -m utils.scan_rollup verify            # bandingkan dengan egg_scans
+    python -m utils.scan_rollup rebuild           # hitung ulang semua
+    python -m utils.scan_rollup rebuild --user 3  # satu farm saja
+"""
+import argparse
+from collections import defaultdict
+from decimal import Decimal
+
+import mysql.connector
+
+from utils.database import get_db_connection
+
+UPSERT_SQL = """
+    INSERT INTO egg_scan_daily
+        (user_id, day, grade, status, scan_count, weight_sum, weight_count)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        scan_count   = scan_count + VALUES(scan_count),
+        weight_sum   = weight_sum + VALUES(weight_sum),
+        weight_count = weight_count + VALUES(weight_count)
+"""
+
+# agregat live dari egg_scans, dipakai rebuild & verify
+_AGGREGATE_SQL = """
+    SELECT user_id, DATE(scanned_at) AS day, grade, COALESCE(status, 'available') AS status,
+           COUNT(*) AS scan_count, COALESCE(SUM(berat_telur), 0) AS weight_sum,
+           COUNT(berat_telur) AS weight_count
+    FROM egg_scans
+    WHERE scanned_at IS NOT NULL {where}
+    GROUP BY user_id, DATE(scanned_at), grade, COALESCE(status, 'available')
+"""
+
+
+def _upsert(conn, deltas):
+    """deltas {(user_id, day, grade, status): [count, weight_sum, weight_count]}"""
+    if not deltas:
+        return
+    cur = conn.cursor()
+    cur.executemany(UPSERT_SQL, [key + tuple(value) for key, value in deltas.items()])
+    cur.close()
+
+
+def add_scans(conn, scans, status="available"):
+    """
+    Catat scan baru. scans: list (user_id, day, grade, berat_telur | None).
+    Tidak commit: dipanggil sebelum commit insert egg_scans-nya.
+    """
+    deltas = defaultdict(lambda: [0, Decimal(0), 0])
+    for user_id, day, grade, weight in scans:
+        entry = deltas[(user_id, day, grade, status)]
+        entry[0] += 1
+        if weight is not None:
+            entry[1] += Decimal(str(weight))
+            entry[2] += 1
+    _upsert(conn, deltas)
+
+
+def move_status(conn, scan_ids, new_status):
+    """
+    Pindahkan scan_ids ke new_status di rollup. Panggil tepat sebelum
+    UPDATE egg_scans SET status = new_status ... di transaksi yang sama;
+    baris dikunci (FOR UPDATE) supaya status lama yang dibaca tetap benar.
+    """
+    if not scan_ids:
+        return
+    cur = conn.cursor()
+    placeholders = ','.join(['%s'] * len(scan_ids))
+    cur.execute(f"""
+        SELECT user_id, DATE(scanned_at), grade, COALESCE(status, 'available'), berat_telur
+        FROM egg_scans
+        WHERE id IN ({placeholders})
+          AND scanned_at IS NOT NULL
+        FOR UPDATE
+    """, list(scan_ids))
+    rows = cur.fetchall()
+    cur.close()
+
+    deltas = defaultdict(lambda: [0, Decimal(0), 0])
+    for user_id, day, grade, status, weight in rows:
+        if status == new_status:
+            continue
+        for key, sign in (((user_id, day, grade, status), -1), ((user_id, day, grade, new_status), 1)):
+            entry = deltas[key]
+            entry[0] += sign
+            if weight is not None:
+                entry[1] += sign * weight
+                entry[2] += sign
+    _upsert(conn, deltas)
+
+
+def rebuild(user_id=None):
+    """Hitung ulang rollup dari egg_scans (semua / satu user) dalam satu transaksi"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError("Tidak bisa konek ke database")
+    try:
+        cur = conn.cursor()
+        where, params = ("AND user_id = %s", (user_id,)) if user_id is not None else ("", ())
+        cur.execute(f"DELETE FROM egg_scan_daily WHERE 1 = 1 {where}", params)
+        cur.execute(
+            "INSERT INTO egg_scan_daily (user_id, day, grade, status, scan_count, weight_sum, weight_count) "
+            + _AGGREGATE_SQL.format(where=where),
+            params,
+        )
+        rows = cur.rowcount
+        conn.commit()
+        cur.close()
+        return rows
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def verify(user_id=None, limit=20):
+    """Bandingkan rollup dengan agregat live egg_scans -> jumlah key yang beda"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError("Tidak bisa konek ke database")
+    try:
+        cur = conn.cursor()
+        where, params = ("AND user_id = %s", (user_id,)) if user_id is not None else ("", ())
+        cur.execute(_AGGREGATE_SQL.format(where=where), params)
+        live = {tuple(r[:4]): (int(r[4]), Decimal(r[5]), int(r[6])) for r in cur.fetchall()}
+        cur.execute(
+            "SELECT user_id, day, grade, status, scan_count, weight_sum, weight_count "
+            f"FROM egg_scan_daily WHERE 1 = 1 {where}",
+            params,
+        )
+        rollup = {tuple(r[:4]): (int(r[4]), Decimal(r[5]), int(r[6])) for r in cur.fetchall()}
+        cur.close()
+    finally:
+        conn.close()
+
+    empty = (0, Decimal(0), 0)
+    diffs = [
+        (key, rollup.get(key, empty), live.get(key, empty))
+        for key in sorted(set(live) | set(rollup), key=str)
+        if rollup.get(key, empty) != live.get(key, empty)
+    ]
+    for key, got, want in diffs[:limit]:
+        print(f"  {key}: rollup={got} egg_scans={want}")
+    return len(diffs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rollup harian egg_scan_daily")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="hitung ulang dari egg_scans (backfill)")
+    p_rebuild.add_argument("--user", type=int, default=None)
+    p_verify = sub.add_parser("verify", help="bandingkan rollup dengan egg_scans")
+    p_verify.add_argument("--user", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rows = rebuild(args.user)
+        print(f"✅ egg_scan_daily dibangun ulang: {rows} baris")
+        return
+
+    diffs = verify(args.user)
+    if diffs:
+        print(f"❌ {diffs} key beda, jalankan `python -m utils.scan_rollup rebuild`")
+        raise SystemExit(1)
+    print("✅ Rollup cocok dengan egg_scans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# utils/scan_store.py
+import mysql.connector
+from utils.database import get_db_connection
+from utils.scan_rollup import add_scans
+
+INSERT_SCAN_SQL = """
+    INSERT INTO egg_scans (
+        user_id,
+        numeric_id,
+        scanned_at,
+        ketebalan,
+        kebersihan,
+        keutuhan,
+        kesegaran,
+        berat_telur,
+        grade,
+        confidence,
+        image_path,
+        status,
+        is_listed
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+        'available', FALSE
+    )
+"""
+
+# posisi kolom di tuple scan_row()
+_ROW_USER, _ROW_WEIGHT, _ROW_GRADE = 0, 6, 7
+
+
+INSERT_VIEW_SQL = """
+    INSERT INTO egg_scan_views (
+        egg_scan_id, camera, image_path, keutuhan, keutuhan_conf, color, color_conf
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def scan_row(user_id, grade, grade_conf, detail, image_path):
+    """Parameter INSERT_SCAN_SQL untuk satu hasil prediksi (scanned_at diisi saat insert)"""
+    return (
+        user_id,
+        None,                     # numeric_id
+        None,                     # ketebalan
+        detail.get("color"),      # sementara taruh warna di "kebersihan"
+        detail.get("keutuhan"),   # keutuhan
+        None,                     # kesegaran
+        None,                     # berat_telur
+        grade,
+        grade_conf,
+        image_path,
+    )
+
+
+def _begin_insert(cur, rows):
+    """
+    Waktu scan diambil sekali dari DB (NOW()), dipakai untuk egg_scans.scanned_at
+    dan hari di rollup, supaya insert menjelang tengah malam tidak beda hari.
+    -> (parameter INSERT_SCAN_SQL, entri add_scans)
+    """
+    cur.execute("SELECT NOW()")
+    scanned_at = cur.fetchone()[0]
+    params = [tuple(row[:2]) + (scanned_at,) + tuple(row[2:]) for row in rows]
+    rollup = [(row[_ROW_USER], scanned_at.date(), row[_ROW_GRADE], row[_ROW_WEIGHT]) for row in rows]
+    return params, rollup
+
+
+def insert_scans(rows, embeddings=None):
+    """
+    Simpan satu / banyak hasil scan ke egg_scans dalam satu executemany.
+    Bisa dipanggil di luar request context (background job).
+
+    embeddings (opsional, sejajar dengan rows): vektor detail["embedding"];
+    kalau ada, baris di-insert satu-satu (butuh id tiap baris) dalam satu
+    transaksi, lalu vektornya ditulis ke embedding store.
+    Rollup harian (egg_scan_daily) ikut di-update di transaksi yang sama.
+    Return True kalau berhasil.
+    """
+    if not rows:
+        return True
+
+    embeddings = embeddings if embeddings and any(e is not None for e in embeddings) else None
+
+    conn = get_db_connection()
+    if not conn:
+        return False
+
+    try:
+        cur = conn.cursor()
+        params, rollup = _begin_insert(cur, rows)
+        if embeddings is None:
+            cur.executemany(INSERT_SCAN_SQL, params)
+        else:
+            scan_ids = []
+            for row in params:
+                cur.execute(INSERT_SCAN_SQL, row)
+                scan_ids.append(cur.lastrowid)
+        add_scans(conn, rollup)
+        conn.commit()
+        cur.close()
+    except mysql.connector.Error as e:
+        conn.rollback()
+        print(f"Insert egg_scans error: {e}")
+        return False
+    finally:
+        conn.close()
+
+    if embeddings is not None:
+        _store_embeddings(scan_ids, embeddings)
+    return True
+
+
+def _store_embeddings(scan_ids, embeddings):
+    """
+    Gagal simpan embedding tidak menggagalkan scan (cuma dicatat). Index
+    "telur serupa" membaca store langsung, jadi tidak perlu di-update.
+    """
+    from utils.embedding_store import get_store
+
+    try:
+        get_store().put_many(scan_ids, embeddings)
+    except (OSError, ValueError) as e:
+        print(f"Simpan embedding error: {e}")
+
+
+def insert_scan_with_views(row, views):
+    """
+    Simpan satu scan multi-kamera: baris egg_scans (hasil fusi) + semua view
+    ke egg_scan_views dalam satu transaksi.
+
+    views: list (camera, image_path, detail_view).
+    Return id egg_scans baru, atau None kalau gagal.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+
+    try:
+        cur = conn.cursor()
+        params, rollup = _begin_insert(cur, [row])
+        cur.execute(INSERT_SCAN_SQL, params[0])
+        scan_id = cur.lastrowid
+        cur.executemany(INSERT_VIEW_SQL, [
+            (
+                scan_id, camera, image_path,
+                view.get("keutuhan"), view.get("keutuhan_conf"),
+                view.get("color"), view.get("color_conf"),
+            )
+            for camera, image_path, view in views
+        ])
+        add_scans(conn, rollup)
+        conn.commit()
+        cur.close()
+        return scan_id
+    except mysql.connector.Error as e:
+        conn.rollback()
+        print(f"Insert egg_scans multi-view error: {e}")
+        return None
+    finally:
+        conn.close()
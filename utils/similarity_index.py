@@ -0,0 +1,254 @@
+# utils/similarity_index.py
+"""
+Index nearest-neighbour (cosine) di atas embedding scan (utils/embedding_store).
+
+Vektor tidak disalin ke memori proses: query diskor langsung dari memmap
+embedding store per potongan, jadi scan dari worker lain otomatis ikut dan
+tiap worker tidak menyimpan salinan store sendiri.
+
+- "exact": skor = dot product per potongan memmap, top-k lewat argpartition.
+  Cukup untuk farm kecil.
+- "ivf"  : k-means kasar (nlist centroid ~ sqrt(N)) dilatih OFFLINE dan
+  disimpan di <EMBEDDING_STORE_PATH>.ivf.npz; query cuma diskor ke vektor di
+  `nprobe` cluster terdekat + scan yang masuk setelah pelatihan terakhir.
+  Dipakai otomatis (SIMILAR_INDEX=auto) kalau file IVF berisi minimal
+  SIMILAR_IVF_MIN_SCANS scan.
+
+    python -m utils.similarity_index train           # latih / latih ulang IVF
+    python -m utils.similarity_index stats
+    python -m utils.similarity_index bench --queries 50
+
+Latih ulang kalau `stats` menunjukkan banyak scan belum masuk cluster
+(mis. jumlah scan sudah 4x sejak pelatihan): worker memuat file baru
+otomatis saat query berikutnya.
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+from config import SIMILAR_INDEX, SIMILAR_IVF_MIN_SCANS, SIMILAR_IVF_NPROBE
+from utils.embedding_store import get_store
+
+_CHUNK = 65536
+_KMEANS_SAMPLE = 50_000
+_KMEANS_ITERS = 10
+
+
+def _normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    norm = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norm == 0, 1.0, norm)
+
+
+def _top_k(scores, positions, k):
+    """(scores, positions) -> k skor tertinggi, urut menurun"""
+    if len(scores) > k:
+        part = np.argpartition(-scores, k)[:k]
+        scores, positions = scores[part], positions[part]
+    order = np.argsort(-scores)
+    return scores[order], positions[order]
+
+
+def _nearest_centroids(vectors, centroids, n):
+    scores = np.asarray(vectors, dtype=np.float32) @ centroids.T
+    if n >= scores.shape[1]:
+        return np.argsort(-scores, axis=1)
+    return np.argpartition(-scores, n, axis=1)[:, :n]
+
+
+def ivf_path(store):
+    return f"{store.path}.ivf.npz"
+
+
+class SimilarityIndex:
+    def __init__(self, store, mode=SIMILAR_INDEX, ivf_min=SIMILAR_IVF_MIN_SCANS, nprobe=SIMILAR_IVF_NPROBE):
+        self.store = store
+        self.mode = mode
+        self.ivf_min = ivf_min
+        self.nprobe = nprobe
+
+        self._ivf = None          # {"centroids", "order", "offsets", "trained_until"}
+        self._ivf_mtime = None
+        self._lock = threading.Lock()
+        self._stats = {"queries": 0, "last_query_ms": 0.0}
+
+    # ---------- IVF (file hasil `train`) ----------
+
+    def _load_ivf(self):
+        """File IVF terbaru (dimuat ulang kalau dilatih ulang), None kalau belum ada / tidak cocok"""
+        path = ivf_path(self.store)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        with self._lock:
+            if mtime != self._ivf_mtime:
+                with np.load(path) as data:
+                    ivf = {name: data[name] for name in data.files}
+                if self.store.dim is None or ivf["centroids"].shape[1] != self.store.dim:
+                    print(f"[SimilarityIndex] {path} tidak cocok dengan embedding store, latih ulang")
+                    ivf = None
+                self._ivf, self._ivf_mtime = ivf, mtime
+            return self._ivf
+
+    def _use_ivf(self, ivf):
+        if self.mode == "exact" or ivf is None:
+            return False
+        return self.mode == "ivf" or len(ivf["order"]) >= self.ivf_min
+
+    def _candidate_chunks(self, query, ivf):
+        """(ids, embeddings) yang perlu diskor: isi cluster terdekat + scan setelah pelatihan"""
+        probe = _nearest_centroids(query[None, :], ivf["centroids"], min(self.nprobe, len(ivf["centroids"])))[0]
+        offsets, order = ivf["offsets"], ivf["order"]
+        ids = np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe])
+        for start in range(0, len(ids), _CHUNK):
+            chunk = ids[start:start + _CHUNK]
+            yield chunk, self.store.get(chunk)
+        yield from self.store.chunks(after_id=int(ivf["trained_until"]), size=_CHUNK)
+
+    # ---------- query ----------
+
+    def search_vector(self, vector, k=10, exclude_id=None):
+        """Vektor query -> list (scan_id, similarity) terurut, maksimal k"""
+        t0 = time.perf_counter()
+        query = _normalize(vector).ravel()
+        ivf = self._load_ivf()
+        chunks = self._candidate_chunks(query, ivf) if self._use_ivf(ivf) else self.store.chunks(size=_CHUNK)
+        k_plus = k + (1 if exclude_id is not None else 0)
+
+        best_scores, best_ids = np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        for ids, vectors in chunks:
+            scores = _normalize(vectors) @ query
+            best_scores, best_ids = _top_k(
+                np.concatenate([best_scores, scores]), np.concatenate([best_ids, ids]), k_plus
+            )
+        result = [(int(i), float(s)) for s, i in zip(best_scores, best_ids) if int(i) != exclude_id][:k]
+
+        with self._lock:
+            self._stats["queries"] += 1
+            self._stats["last_query_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        return result
+
+    def search(self, scan_id, k=10):
+        """Scan serupa dengan scan_id (scan itu sendiri tidak ikut)"""
+        vector = self.store.get([scan_id])
+        if vector.shape[1] == 0 or not vector.any():
+            return []
+        return self.search_vector(vector[0], k, exclude_id=scan_id)
+
+    def stats(self):
+        ivf = self._load_ivf()
+        with self._lock:
+            return {
+                **self._stats,
+                "mode": self.mode,
+                "ivf_active": self._use_ivf(ivf),
+                "ivf_clusters": 0 if ivf is None else len(ivf["centroids"]),
+                "ivf_trained": 0 if ivf is None else len(ivf["order"]),
+                "ivf_trained_until": None if ivf is None else int(ivf["trained_until"]),
+            }
+
+
+def train_ivf(store, nlist=None, seed=0):
+    """
+    Latih centroid IVF dari seluruh store lalu simpan ke ivf_path(store):
+    centroids, id scan urut per cluster (order + offsets), dan id terakhir
+    yang ikut dilatih (scan setelahnya diskor exact sampai latih ulang).
+    """
+    ids = np.concatenate([chunk for chunk, _ in store.chunks(size=_CHUNK)] or [np.zeros(0, dtype=np.int64)])
+    n = len(ids)
+    if n == 0:
+        raise ValueError("Embedding store kosong")
+    nlist = nlist or max(1, int(np.sqrt(n)))
+    rng = np.random.default_rng(seed)
+    sample_ids = np.sort(rng.choice(ids, size=min(n, _KMEANS_SAMPLE), replace=False))
+    sample = _normalize(store.get(sample_ids))
+
+    centroids = sample[rng.choice(len(sample), size=min(nlist, len(sample)), replace=False)]
+    for _ in range(_KMEANS_ITERS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=len(centroids))
+        # cluster kosong: pertahankan centroid lama
+        centroids = np.where(counts[:, None] > 0, _normalize(sums), centroids)
+
+    all_ids, assign = [], []
+    for chunk_ids, vectors in store.chunks(size=_CHUNK):
+        all_ids.append(chunk_ids)
+        assign.append(_nearest_centroids(_normalize(vectors), centroids, 1)[:, 0])
+    all_ids, assign = np.concatenate(all_ids), np.concatenate(assign)
+    by_cluster = np.argsort(assign, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))])
+
+    path = ivf_path(store)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(
+        tmp_path,
+        centroids=centroids.astype(np.float32),
+        order=all_ids[by_cluster],
+        offsets=offsets.astype(np.int64),
+        trained_until=np.int64(all_ids.max()),
+    )
+    os.replace(tmp_path, path)
+    return len(all_ids), len(centroids)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index(create=True):
+    """Satu index per proses (create=False: jangan bikin)"""
+    global _index
+    if _index is None and create:
+        with _index_lock:
+            if _index is None:
+                _index = SimilarityIndex(get_store())
+    return _index
+
+
+def _bench(queries, k):
+    store = get_store()
+    ids = np.concatenate([chunk for chunk, _ in store.chunks(size=_CHUNK)] or [np.zeros(0, dtype=np.int64)])
+    if len(ids) == 0:
+        raise SystemExit("Embedding store kosong")
+    index = get_index()
+    rng = np.random.default_rng(0)
+    latencies = []
+    for scan_id in rng.choice(ids, size=min(queries, len(ids)), replace=False):
+        t0 = time.perf_counter()
+        index.search(int(scan_id), k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    print(
+        f"{len(latencies)} query di {len(ids)} scan ({'ivf' if index.stats()['ivf_active'] else 'exact'}): "
+        f"p50={np.percentile(latencies, 50):.2f}ms  p95={np.percentile(latencies, 95):.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index telur serupa (IVF di atas embedding store)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_train = sub.add_parser("train", help="latih centroid IVF dan simpan di samping embedding store")
+    p_train.add_argument("--nlist", type=int, default=None, help="jumlah cluster (default sqrt(N))")
+    sub.add_parser("stats", help="ringkasan store + file IVF")
+    p_bench = sub.add_parser("bench", help="latensi query dari scan acak")
+    p_bench.add_argument("--queries", type=int, default=50)
+    p_bench.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "train":
+        t0 = time.perf_counter()
+        n, nlist = train_ivf(get_store(), args.nlist)
+        print(f"✅ IVF dilatih: {n} vektor, {nlist} cluster ({time.perf_counter() - t0:.1f}s) -> {ivf_path(get_store())}")
+    elif args.command == "stats":
+        print({**get_store().stats(), **get_index().stats()})
+    else:
+        _bench(args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
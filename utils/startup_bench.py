@@ -0,0 +1,60 @@
+# utils/startup_bench.py
+"""
+Benchmark waktu start worker.
+
+    python -m utils.startup_bench --runs 3
+
+Tiap run jalan di proses baru (import dingin), mengukur:
+  - import_app_s : `import app` sampai Flask siap melayani request
+  - load_models_s: ml_utils.load_models() (TensorFlow + model)
+  - first_predict_s: satu prediksi dummy pertama setelah model siap
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+_CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import app  # noqa: F401
+t1 = time.perf_counter()
+from utils import ml_utils
+ml_utils.load_models()
+t2 = time.perf_counter()
+import numpy as np
+ml_utils._infer_batch(np.zeros((1, 224, 224, 3), dtype=np.float32))
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_app_s": t1 - t0,
+    "load_models_s": t2 - t1,
+    "first_predict_s": t3 - t2,
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark startup worker EggVision")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    results = []
+    for i in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD], capture_output=True, text=True, check=True
+        ).stdout
+        row = json.loads(out.strip().splitlines()[-1])
+        results.append(row)
+        print(
+            f"run {i + 1}: import app {row['import_app_s']:.2f}s · "
+            f"load model {row['load_models_s']:.2f}s · "
+            f"prediksi pertama {row['first_predict_s']:.2f}s"
+        )
+
+    for key in ("import_app_s", "load_models_s", "first_predict_s"):
+        values = sorted(r[key] for r in results)
+        print(f"{key:<16} median {values[len(values) // 2]:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
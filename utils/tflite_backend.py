@@ -0,0 +1,69 @@
+# utils/tflite_backend.py
+"""
+Backend ringan untuk file .tflite (INFERENCE_BACKEND = "tflite").
+
+Pakai `tflite_runtime` kalau terpasang (edge box CPU-only, tanpa TensorFlow
+penuh), kalau tidak ada jatuh ke `tf.lite.Interpreter`.
+Antarmukanya sama dengan model Keras: `predict(batch) -> probabilitas`.
+"""
+import threading
+
+import numpy as np
+
+try:
+    from tflite_runtime.interpreter import Interpreter
+except ImportError:  # pragma: no cover - tergantung environment
+    from tensorflow.lite import Interpreter
+
+
+class TFLiteModel:
+    """Bungkus tf.lite Interpreter supaya bisa dipakai seperti model Keras"""
+
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self._interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+        # Interpreter tidak thread-safe
+        self._lock = threading.Lock()
+
+    @property
+    def is_quantized(self):
+        return self._input["dtype"] in (np.int8, np.uint8)
+
+    def _resize(self, batch_size):
+        if batch_size == self._batch_size:
+            return
+        shape = list(self._input["shape"])
+        shape[0] = batch_size
+        self._interpreter.resize_tensor_input(self._input["index"], shape)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    def predict(self, batch, verbose=0):
+        """Batch (N, 224, 224, 3) float32 [0..1] -> probabilitas (N, n_class) float32"""
+        batch = np.asarray(batch, dtype=np.float32)
+
+        with self._lock:
+            self._resize(batch.shape[0])
+
+            if self.is_quantized:
+                # model int8 penuh: quantize input pakai scale / zero_point dari converter
+                scale, zero_point = self._input["quantization"]
+                batch = np.round(batch / scale + zero_point)
+                info = np.iinfo(self._input["dtype"])
+                batch = np.clip(batch, info.min, info.max).astype(self._input["dtype"])
+
+            self._interpreter.set_tensor(self._input["index"], batch)
+            self._interpreter.invoke()
+            output = self._interpreter.get_tensor(self._output["index"]).copy()
+
+        if self._output["dtype"] in (np.int8, np.uint8):
+            scale, zero_point = self._output["quantization"]
+            output = (output.astype(np.float32) - zero_point) * scale
+
+        return output.astype(np.float32)
@@ -0,0 +1,209 @@
+# utils/tray_segmentation.py
+"""
+Segmentasi foto tray / conveyor -> crop per butir telur (CV klasik, tanpa
+OpenCV: cukup Pillow + NumPy).
+
+Langkah:
+1. gambar diperkecil ke WORK_SIDE (sisi terpanjang) untuk segmentasi
+2. warna latar = median pixel di tepi gambar (tray / conveyor)
+3. jarak warna tiap pixel ke latar, threshold Otsu -> mask telur
+4. opening (MinFilter + MaxFilter) supaya telur yang bersentuhan tipis terpisah
+5. connected component per baris (run-length + union-find)
+6. buang komponen yang bukan telur: terlalu kecil, rasio aspek aneh, fill rendah
+7. kotak dipetakan balik ke resolusi asli, dibuat persegi + padding
+
+Debug / tuning:
+
+    python -m utils.tray_segmentation foto_tray.jpg --out /tmp/crops
+"""
+import argparse
+import os
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+WORK_SIDE = 480
+BORDER_FRACTION = 0.04     # lebar tepi untuk estimasi warna latar
+OPEN_SIZE = 5              # kernel opening (pixel, di gambar kerja)
+MIN_AREA_FRACTION = 0.002  # komponen < 0.2% gambar = noise
+MIN_ASPECT, MAX_ASPECT = 0.5, 2.0
+MIN_FILL = 0.5             # elips penuh di dalam kotak ~0.785
+AREA_RANGE = (0.3, 3.0)    # relatif terhadap median luas komponen
+CROP_PADDING = 0.12
+
+
+def _work_image(img):
+    """Perkecil untuk segmentasi -> (array float32 H x W x 3, skala ke asli)"""
+    scale = min(1.0, WORK_SIDE / max(img.size))
+    if scale < 1.0:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(size, Image.BILINEAR)
+    return np.asarray(img, dtype=np.float32), scale
+
+
+def _otsu_threshold(values, bins=256):
+    hist, edges = np.histogram(values, bins=bins)
+    hist = hist.astype(np.float64)
+    centers = (edges[:-1] + edges[1:]) / 2
+
+    w0 = np.cumsum(hist)
+    w1 = w0[-1] - w0
+    m0 = np.cumsum(hist * centers) / np.maximum(w0, 1)
+    m1 = ((hist * centers).sum() - np.cumsum(hist * centers)) / np.maximum(w1, 1)
+    between = w0 * w1 * (m0 - m1) ** 2
+    return centers[int(np.argmax(between))]
+
+
+def _foreground_mask(arr):
+    """Mask bool pixel yang warnanya beda dari latar (tepi gambar)"""
+    h, w, _ = arr.shape
+    bh, bw = max(1, int(h * BORDER_FRACTION)), max(1, int(w * BORDER_FRACTION))
+    border = np.concatenate([
+        arr[:bh].reshape(-1, 3), arr[-bh:].reshape(-1, 3),
+        arr[:, :bw].reshape(-1, 3), arr[:, -bw:].reshape(-1, 3),
+    ])
+    background = np.median(border, axis=0)
+
+    dist = np.linalg.norm(arr - background, axis=2)
+    mask = dist > _otsu_threshold(dist)
+
+    mask_img = Image.fromarray(mask.astype(np.uint8) * 255)
+    mask_img = mask_img.filter(ImageFilter.MinFilter(OPEN_SIZE)).filter(ImageFilter.MaxFilter(OPEN_SIZE))
+    return np.asarray(mask_img) > 127
+
+
+def _components(mask):
+    """
+    Connected component (4-neighbour) berbasis run per baris.
+    Return list [area, x0, y0, x1, y1] (x1/y1 eksklusif).
+    """
+    parent = []
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    runs, prev = [], []
+    for y, row in enumerate(mask):
+        d = np.diff(np.concatenate(([0], row.astype(np.int8), [0])))
+        starts, ends = np.flatnonzero(d == 1).tolist(), np.flatnonzero(d == -1).tolist()
+
+        cur, j = [], 0
+        for s, e in zip(starts, ends):
+            while j < len(prev) and prev[j][1] <= s:
+                j += 1
+            label, k = None, j
+            while k < len(prev) and prev[k][0] < e:
+                root = find(prev[k][2])
+                if label is None:
+                    label = root
+                elif root != label:
+                    parent[root] = label
+                k += 1
+            if label is None:
+                label = len(parent)
+                parent.append(label)
+            cur.append((s, e, label))
+            runs.append((y, s, e, label))
+        prev = cur
+
+    comps = {}
+    for y, s, e, label in runs:
+        root = find(label)
+        c = comps.get(root)
+        if c is None:
+            comps[root] = [e - s, s, y, e, y + 1]
+        else:
+            c[0] += e - s
+            c[1], c[2] = min(c[1], s), min(c[2], y)
+            c[3], c[4] = max(c[3], e), max(c[4], y + 1)
+    return list(comps.values())
+
+
+def _is_egg(comp, min_area):
+    area, x0, y0, x1, y1 = comp
+    bw, bh = x1 - x0, y1 - y0
+    return (
+        area >= min_area
+        and MIN_ASPECT <= bw / bh <= MAX_ASPECT
+        and area / (bw * bh) >= MIN_FILL
+    )
+
+
+def _reading_order(boxes):
+    """Urutkan kotak per baris (atas -> bawah), lalu kiri -> kanan"""
+    if not boxes:
+        return boxes
+    tolerance = np.median([y1 - y0 for _, y0, _, y1 in boxes]) / 2
+    boxes = sorted(boxes, key=lambda b: (b[1] + b[3]) / 2)
+
+    rows, row_y = [], None
+    for box in boxes:
+        cy = (box[1] + box[3]) / 2
+        if row_y is None or cy - row_y > tolerance:
+            rows.append([])
+            row_y = cy
+        rows[-1].append(box)
+    return [box for row in rows for box in sorted(row, key=lambda b: b[0])]
+
+
+def find_eggs(img, max_eggs=None):
+    """
+    PIL RGB (resolusi asli) -> list kotak (x0, y0, x1, y1) per telur di
+    koordinat gambar asli, urut baca (baris demi baris).
+    Foto satu butir tetap menghasilkan satu kotak.
+    """
+    arr, scale = _work_image(img)
+    comps = _components(_foreground_mask(arr))
+
+    min_area = MIN_AREA_FRACTION * arr.shape[0] * arr.shape[1]
+    comps = [c for c in comps if _is_egg(c, min_area)]
+    if comps:
+        median_area = np.median([c[0] for c in comps])
+        lo, hi = AREA_RANGE
+        comps = [c for c in comps if lo * median_area <= c[0] <= hi * median_area]
+
+    boxes = []
+    for _, x0, y0, x1, y1 in comps:
+        # kotak persegi di sekitar pusat telur + padding, dibatasi tepi gambar
+        side = max(x1 - x0, y1 - y0) * (1 + 2 * CROP_PADDING) / scale
+        cx, cy = (x0 + x1) / 2 / scale, (y0 + y1) / 2 / scale
+        boxes.append((
+            max(0, int(cx - side / 2)), max(0, int(cy - side / 2)),
+            min(img.width, int(cx + side / 2)), min(img.height, int(cy + side / 2)),
+        ))
+
+    boxes = _reading_order(boxes)
+    return boxes[:max_eggs] if max_eggs else boxes
+
+
+def crop_eggs(img, boxes):
+    """Potong gambar asli per kotak -> list PIL RGB"""
+    return [img.crop(box) for box in boxes]
+
+
+def main():
+    from utils.image_io import open_rgb
+
+    parser = argparse.ArgumentParser(description="Segmentasi foto tray -> crop telur")
+    parser.add_argument("image")
+    parser.add_argument("--out", default=None, help="folder untuk simpan crop")
+    args = parser.parse_args()
+
+    img = open_rgb(args.image)
+    boxes = find_eggs(img)
+    print(f"{len(boxes)} telur terdeteksi di {args.image}")
+    for i, box in enumerate(boxes):
+        print(f"  #{i + 1:02d} {box}")
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(args.image))[0]
+        for i, crop in enumerate(crop_eggs(img, boxes)):
+            crop.save(os.path.join(args.out, f"{stem}_egg{i + 1:02d}.jpg"), quality=90)
+
+
+if __name__ == "__main__":
+    main()